@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+批处理调度模块
+
+将短时间窗口内并发到达的转录请求合并为一次模型推理:
+- 基于 asyncio.Queue 收集请求
+- 按 (模型, 源语言, 目标语言, 时间戳, 输入类型) 分组, 保证同一批次任务标记一致
+- 批内按音频时长排序并分桶, 减少填充浪费
+- 通过 asyncio.Future 将结果分发回各个请求
+- GPU 推理在专用线程中执行, 不阻塞事件循环
+"""
+
+import os
+import bisect
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Any, Dict, List, NamedTuple, Tuple
+
+from loguru import logger
+
+from .multi_model_manager import get_multi_model_manager
+from .pinned_pool import get_pinned_audio_pool
+from .utils import AudioInput
+
+
+class _BatchRequest(NamedTuple):
+    """队列中的单个转录请求"""
+    model_name: str
+    audio: AudioInput
+    source_lang: str
+    target_lang: str
+    timestamps: bool
+    duration: Optional[float]
+    future: asyncio.Future
+
+
+# 分组键: (模型名称, 源语言, 目标语言, 是否需要时间戳, 是否为文件路径)
+# NeMo 不支持在同一次调用中混合文件路径和数组输入
+BatchKey = Tuple[str, str, str, bool, bool]
+
+
+def run_batch_inference(
+    model_name: str,
+    audios: List[AudioInput],
+    source_lang: str,
+    target_lang: str,
+    timestamps: bool,
+) -> List[Any]:
+    """
+    对一组音频执行一次模型推理 (阻塞调用)
+
+    Args:
+        model_name: 模型名称
+        audios: 音频文件路径或 16kHz 单声道数组列表, 同一批次内类型须一致
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+        timestamps: 是否提取时间戳
+
+    Returns:
+        模型输出列表, 与 audios 一一对应
+    """
+    multi_manager = get_multi_model_manager()
+    with multi_manager.get_model(model_name) as model, _stage_inputs(audios) as inputs:
+        output = model.transcribe(
+            inputs,
+            batch_size=len(inputs),
+            source_lang=source_lang,
+            target_lang=target_lang,
+            timestamps=timestamps,
+        )
+    return list(output) if output else []
+
+
+@contextmanager
+def _stage_inputs(audios: List[AudioInput]):
+    """
+    准备模型输入
+
+    启用锁页内存缓冲池且 GPU 可用时, 将已解码的音频数组拷贝到锁页缓冲区;
+    否则原样返回
+    """
+    pool = get_pinned_audio_pool()
+    if not pool.enabled or isinstance(audios[0], str):
+        yield audios
+        return
+
+    import torch
+
+    if not torch.cuda.is_available():
+        yield audios
+        return
+
+    with pool.stage(audios) as inputs:
+        yield inputs
+
+
+class BatchScheduler:
+    """
+    动态批处理调度器
+
+    后台任务从队列中取出第一个请求后, 在 batch_window_ms 时间窗口内继续收集,
+    直到达到 max_batch_size 或窗口结束, 然后按任务参数分组并调用模型推理。
+
+    GPU 推理期间新到达的请求会在队列中积累, 从而自然形成更大的批次。
+
+    使用示例:
+        scheduler = get_batch_scheduler()
+        scheduler.start()
+        output = await scheduler.submit("canary-1b-v2", "audio.wav", "en", "en", True)
+    """
+
+    def __init__(
+        self,
+        max_batch_size: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+        bucket_boundaries: Optional[List[float]] = None,
+    ):
+        """
+        初始化批处理调度器
+
+        Args:
+            max_batch_size: 单批次最大请求数, 默认从环境变量 MAX_BATCH_SIZE 读取
+            batch_window_ms: 批次收集窗口(毫秒), 默认从环境变量 BATCH_WINDOW_MS 读取
+            bucket_boundaries: 时长分桶边界(秒), 默认从环境变量 BUCKET_DURATION_S 读取
+        """
+        self.max_batch_size = max(1, max_batch_size or int(os.getenv("MAX_BATCH_SIZE", "16")))
+        self.batch_window_ms = (
+            batch_window_ms if batch_window_ms is not None
+            else int(os.getenv("BATCH_WINDOW_MS", "30"))
+        )
+        if bucket_boundaries is None:
+            env_buckets = os.getenv("BUCKET_DURATION_S", "5,10,20,30")
+            bucket_boundaries = [float(b) for b in env_buckets.split(",") if b.strip()]
+        self.bucket_boundaries = sorted(bucket_boundaries)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # 专用推理线程: 批次按顺序分发, 一个线程即可让 GPU 保持忙碌,
+        # 且不与默认线程池中的其他阻塞任务争抢
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        logger.info(
+            f"批处理调度器初始化完成 - 最大批次: {self.max_batch_size}, "
+            f"收集窗口: {self.batch_window_ms}ms, "
+            f"时长分桶: {self.bucket_boundaries}"
+        )
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """调度器所在的事件循环, 未启动时为 None"""
+        return self._loop if self.is_running else None
+
+    @property
+    def is_running(self) -> bool:
+        """后台批处理任务是否在运行"""
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """
+        在当前事件循环中启动后台批处理任务
+
+        必须在事件循环内调用 (如 FastAPI lifespan)
+        """
+        if self.is_running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-infer")
+        # 在推理线程中预分配锁页缓冲区, 先于任何批次执行, 且不阻塞事件循环
+        self._executor.submit(get_pinned_audio_pool().preallocate)
+        self._worker = self._loop.create_task(self._run(), name="BatchScheduler")
+        logger.info("批处理调度器已启动")
+
+    async def stop(self) -> None:
+        """停止后台任务, 并使所有未完成的请求失败"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+        # 队列中尚未处理的请求直接失败
+        while self._queue is not None and not self._queue.empty():
+            request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("批处理调度器已关闭"))
+
+        # 等待正在执行的推理结束, 避免在模型卸载后仍访问模型
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+        self._executor = None
+        self._worker = None
+        self._queue = None
+        self._loop = None
+        logger.info("批处理调度器已停止")
+
+    async def submit(
+        self,
+        model_name: str,
+        audio: AudioInput,
+        source_lang: str,
+        target_lang: str,
+        timestamps: bool,
+        duration: Optional[float] = None,
+    ) -> Any:
+        """
+        提交一个转录请求并等待结果
+
+        Args:
+            model_name: 模型名称
+            audio: 音频文件路径或 16kHz 单声道数组
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            timestamps: 是否提取时间戳
+            duration: 音频时长, 用于批内排序
+
+        Returns:
+            该音频对应的模型输出
+        """
+        if not self.is_running:
+            self.start()
+
+        future = self._loop.create_future()
+        await self._queue.put(_BatchRequest(
+            model_name=model_name,
+            audio=audio,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            timestamps=timestamps,
+            duration=duration,
+            future=future,
+        ))
+        return await future
+
+    async def _collect(self) -> List[_BatchRequest]:
+        """
+        收集一个批次的请求
+
+        阻塞等待第一个请求, 然后在时间窗口内尽量收集更多请求
+        """
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.batch_window_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """后台批处理循环"""
+        while True:
+            batch = await self._collect()
+
+            # Canary 要求同一批次使用相同的任务标记, 因此按参数分组
+            groups: Dict[BatchKey, List[_BatchRequest]] = {}
+            for request in batch:
+                key = (
+                    request.model_name,
+                    request.source_lang,
+                    request.target_lang,
+                    request.timestamps,
+                    isinstance(request.audio, str),
+                )
+                groups.setdefault(key, []).append(request)
+
+            for key, requests in groups.items():
+                for bucket in self._split_buckets(requests):
+                    await self._dispatch(key, bucket)
+
+    def _split_buckets(self, requests: List[_BatchRequest]) -> List[List[_BatchRequest]]:
+        """
+        按音频时长排序并分桶
+
+        同一次推理中所有音频会被填充到最长音频的长度, 长短差异很大的音频
+        放在一起会浪费大量计算。按 bucket_boundaries 将请求切分为多个子批次,
+        每个子批次单独推理。
+
+        Args:
+            requests: 同一分组内的请求列表
+
+        Returns:
+            子批次列表, 按时长从短到长排列
+        """
+        # 按时长排序, 让长度相近的音频相邻
+        requests = sorted(requests, key=lambda r: r.duration or 0.0)
+
+        buckets: List[List[_BatchRequest]] = []
+        current_bucket = None
+        for request in requests:
+            bucket = bisect.bisect_left(self.bucket_boundaries, request.duration or 0.0)
+            if bucket != current_bucket:
+                buckets.append([])
+                current_bucket = bucket
+            buckets[-1].append(request)
+
+        return buckets
+
+    async def _dispatch(self, key: BatchKey, requests: List[_BatchRequest]) -> None:
+        """
+        执行一个子批次的推理并将结果分发给各个请求
+
+        Args:
+            key: 分组键
+            requests: 该子批次内的请求列表
+        """
+        model_name, source_lang, target_lang, timestamps, _ = key
+
+        audios = [r.audio for r in requests]
+
+        logger.debug("执行批量推理 - 模型: {}, 批次大小: {}", model_name, len(audios))
+
+        try:
+            outputs = await self._loop.run_in_executor(
+                self._executor,
+                run_batch_inference,
+                model_name,
+                audios,
+                source_lang,
+                target_lang,
+                timestamps,
+            )
+            if len(outputs) != len(requests):
+                raise RuntimeError(
+                    f"模型输出数量与请求数量不一致: {len(outputs)} != {len(requests)}"
+                )
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError("批处理已取消")
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"批量推理失败: {e}")
+            return
+
+        for request, output in zip(requests, outputs):
+            # 客户端断开时 future 可能已被取消
+            if not request.future.done():
+                request.future.set_result(output)
+
+
+# 全局单例实例
+_batch_scheduler: Optional[BatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_batch_scheduler() -> BatchScheduler:
+    """
+    获取批处理调度器单例
+
+    Returns:
+        BatchScheduler 实例
+    """
+    global _batch_scheduler
+
+    if _batch_scheduler is None:
+        with _scheduler_lock:
+            if _batch_scheduler is None:
+                _batch_scheduler = BatchScheduler()
+
+    return _batch_scheduler
+
+
+async def shutdown_batch_scheduler() -> None:
+    """关闭批处理调度器"""
+    global _batch_scheduler
+
+    if _batch_scheduler is not None:
+        await _batch_scheduler.stop()
+        _batch_scheduler = None
@@ -9,27 +9,131 @@
 - 多种输出格式支持
 """
 
+import io
 import os
-import tempfile
-from typing import Optional, Dict, Any, List, Union
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Union, Tuple, BinaryIO
 from pathlib import Path
 
+import numpy as np
 from loguru import logger
 
 from .multi_model_manager import get_multi_model_manager
+from .batch_scheduler import get_batch_scheduler, run_batch_inference
+from .inference_cache import get_inference_cache
 from .utils import (
+    AudioInput,
+    SegmentArray,
+    segments_from_nemo,
     segments_to_srt,
     segments_to_vtt,
+    format_timestamp_srt,
+    format_timestamp_vtt,
     build_json_response,
     build_verbose_json_response,
     normalize_language_code,
-    save_audio_to_temp,
-    cleanup_temp_file,
     get_audio_duration,
-    convert_audio_to_wav,
+    get_audio_duration_from_array,
+    decode_audio,
 )
 
 
+# 没有分段时间戳时的单条字幕模板, 与 segments_to_srt/vtt 对单个分段的输出一致
+_SRT_SINGLE = "1\n00:00:00,000 --> {end}\n{text}"
+_VTT_SINGLE = "WEBVTT\n\n00:00:00.000 --> {end}\n{text}\n"
+
+# 音频预处理线程池 (哈希、解码、时长读取)
+_asr_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_asr_executor() -> ThreadPoolExecutor:
+    """
+    获取音频预处理线程池
+    
+    线程数由环境变量 ASR_WORKERS 控制, 有界线程池避免大量并发上传时
+    占满默认线程池, 影响其他阻塞任务
+    
+    Returns:
+        ThreadPoolExecutor 实例
+    """
+    global _asr_executor
+    
+    if _asr_executor is None:
+        with _executor_lock:
+            if _asr_executor is None:
+                _asr_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("ASR_WORKERS", "4")),
+                    thread_name_prefix="asr",
+                )
+    
+    return _asr_executor
+
+
+def shutdown_asr_executor() -> None:
+    """关闭音频预处理线程池"""
+    global _asr_executor
+    
+    with _executor_lock:
+        if _asr_executor is not None:
+            _asr_executor.shutdown(wait=True)
+            _asr_executor = None
+
+
+async def _run_in_asr_executor(func, *args):
+    """在音频预处理线程池中执行阻塞函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_asr_executor(), func, *args)
+
+
+def _is_running_in_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    """判断当前线程是否正在运行指定的事件循环"""
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+# 正在进行的预加载任务: {模型名称: Future}, 只在事件循环线程中访问
+_prefetch_futures: Dict[str, asyncio.Future] = {}
+
+
+def _prefetch_model(model_name: str) -> None:
+    """
+    模型未加载时在后台线程中开始加载, 不等待完成
+    
+    在推理缓存未命中后调用, 与音频解码并行进行, 冷启动时加载时间可部分被解码时间掩盖;
+    批处理推理时会等待同一次加载完成, 不会重复加载。命中缓存的请求不会触发加载,
+    也就不会因此卸载其他模型。每个模型同一时间最多只有一个预加载任务,
+    并发的冷启动请求不会各占用一个默认线程池线程阻塞在加载锁上
+    
+    Args:
+        model_name: 模型名称
+    """
+    multi_manager = get_multi_model_manager()
+    manager = multi_manager.get_model_manager(model_name)
+    if manager is None or manager.is_loaded or manager.is_loading:
+        return
+    
+    key = manager.model_name
+    pending = _prefetch_futures.get(key)
+    if pending is not None and not pending.done():
+        return
+    
+    def _on_done(future) -> None:
+        if _prefetch_futures.get(key) is future:
+            del _prefetch_futures[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"预加载模型 {model_name} 失败: {future.exception()}")
+    
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, multi_manager.ensure_model_loaded, model_name)
+    _prefetch_futures[key] = future
+    future.add_done_callback(_on_done)
+
+
 class TranscriptionEngine:
     """
     转录引擎类
@@ -49,7 +153,7 @@ class TranscriptionEngine:
     """
     
     # 支持的响应格式
-    SUPPORTED_FORMATS = {"text", "json", "srt", "vtt", "verbose_json"}
+    SUPPORTED_FORMATS = frozenset({"text", "json", "srt", "vtt", "verbose_json"})
     
     def __init__(self, model_name: str = "canary-1b-v2"):
         """
@@ -92,74 +196,50 @@ class TranscriptionEngine:
             ValueError: 不支持的响应格式
             RuntimeError: 转录失败
         """
-        # 验证响应格式
-        if response_format not in self.SUPPORTED_FORMATS:
-            raise ValueError(
-                f"不支持的响应格式: {response_format}, "
-                f"支持的格式: {self.SUPPORTED_FORMATS}"
-            )
+        self._validate_format(response_format)
         
-        # 标准化语言代码
-        source_lang = normalize_language_code(language)
-        target_lang = normalize_language_code(target_language) if target_language else source_lang
-        
-        # 确定是否需要时间戳 (SRT/VTT 格式必须启用)
-        need_timestamps = timestamps or response_format in {"srt", "vtt", "verbose_json"}
-        
-        logger.info(
-            f"开始转录 - 文件: {audio_path}, "
-            f"源语言: {source_lang}, 目标语言: {target_lang}, "
-            f"格式: {response_format}, 时间戳: {need_timestamps}"
+        return self._infer(
+            audio=audio_path,
+            duration=get_audio_duration(audio_path),
+            source=audio_path,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
         )
+    
+    async def transcribe_async(
+        self,
+        audio_path: str,
+        language: Optional[str] = None,
+        response_format: str = "json",
+        timestamps: bool = True,
+        target_language: Optional[str] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        异步执行音频转录
         
-        try:
-            # 获取音频时长
-            duration = get_audio_duration(audio_path)
-            
-            # 使用指定模型进行推理
-            with self.multi_manager.get_model(self.model_name) as model:
-                # 调用模型的 transcribe 方法
-                output = model.transcribe(
-                    [audio_path],
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    timestamps=need_timestamps,
-                )
-                
-                # 提取转录结果
-                if output and len(output) > 0:
-                    result = output[0]
-                    text = result.text if hasattr(result, 'text') else str(result)
-                    
-                    # 提取时间戳信息
-                    segments = []
-                    words = []
-                    
-                    if hasattr(result, 'timestamp') and result.timestamp:
-                        if 'segment' in result.timestamp:
-                            segments = result.timestamp['segment']
-                        if 'word' in result.timestamp:
-                            words = result.timestamp['word']
-                else:
-                    text = ""
-                    segments = []
-                    words = []
-            
-            logger.info(f"转录完成 - 文本长度: {len(text)}, 分段数: {len(segments)}")
-            
-            # 根据格式生成响应
-            return self._format_response(
-                text=text,
-                segments=segments,
-                words=words,
-                language=source_lang,
-                duration=duration,
-                response_format=response_format
-            )
+        请求提交给批处理调度器, 与时间窗口内的其他并发请求合并为一次模型推理
+        
+        Args:
+            参见 transcribe
             
-        except Exception as e:
-            logger.error(f"转录失败: {e}")
-            raise RuntimeError(f"转录失败: {e}") from e
+        Returns:
+            转录结果 (格式取决于 response_format)
+        """
+        self._validate_format(response_format)
+        
+        duration = await _run_in_asr_executor(get_audio_duration, audio_path)
+        
+        return await self._infer_async(
+            audio=audio_path,
+            duration=duration,
+            source=audio_path,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
+        )
     
     def transcribe_bytes(
         self,
@@ -173,8 +253,6 @@ class TranscriptionEngine:
         """
         从字节数据执行音频转录
         
-        用于处理 API 上传的文件数据
-        
         Args:
             audio_bytes: 音频文件的字节内容
             filename: 原始文件名 (用于确定格式)
@@ -186,46 +264,346 @@ class TranscriptionEngine:
         Returns:
             转录结果 (格式取决于 response_format)
         """
-        temp_path = None
-        converted_path = None
+        return self.transcribe_file(
+            audio_file=io.BytesIO(audio_bytes),
+            filename=filename,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
+        )
+    
+    async def transcribe_bytes_async(
+        self,
+        audio_bytes: bytes,
+        filename: str = "audio.wav",
+        language: Optional[str] = None,
+        response_format: str = "json",
+        timestamps: bool = True,
+        target_language: Optional[str] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        从字节数据异步执行音频转录 (经由批处理调度器)
+        
+        Args:
+            参见 transcribe_bytes
+            
+        Returns:
+            转录结果 (格式取决于 response_format)
+        """
+        return await self.transcribe_file_async(
+            audio_file=io.BytesIO(audio_bytes),
+            filename=filename,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
+        )
+    
+    def transcribe_file(
+        self,
+        audio_file: BinaryIO,
+        filename: str = "audio.wav",
+        language: Optional[str] = None,
+        response_format: str = "json",
+        timestamps: bool = True,
+        target_language: Optional[str] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        从文件对象执行音频转录
+        
+        用于处理 API 上传的文件, 音频直接从文件对象流式哈希和解码,
+        不整体读入内存, 也不写额外的临时文件
+        
+        Args:
+            audio_file: 可 seek 的二进制文件对象 (如 UploadFile.file)
+            filename: 原始文件名 (用于确定格式)
+            language: 源语言代码
+            response_format: 响应格式
+            timestamps: 是否提取时间戳
+            target_language: 目标语言
+            
+        Returns:
+            转录结果 (格式取决于 response_format)
+        """
+        self._validate_format(response_format)
+        
+        # 相同音频和参数命中缓存时直接返回, 跳过推理
+        cache = get_inference_cache()
+        cache_key = cache.make_key(
+            cache.hash_audio(audio_file),
+            self.model_name, language, target_language, response_format, timestamps,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("命中推理缓存, 跳过推理")
+            return cached
+        
+        audio = self._decode(audio_file, filename)
+        
+        result = self._infer(
+            audio=audio,
+            duration=get_audio_duration_from_array(audio),
+            source=filename,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
+        )
+        
+        cache.put(cache_key, result)
+        return result
+    
+    async def transcribe_file_async(
+        self,
+        audio_file: BinaryIO,
+        filename: str = "audio.wav",
+        language: Optional[str] = None,
+        response_format: str = "json",
+        timestamps: bool = True,
+        target_language: Optional[str] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        从文件对象异步执行音频转录 (经由批处理调度器)
+        
+        Args:
+            参见 transcribe_file
+            
+        Returns:
+            转录结果 (格式取决于 response_format)
+        """
+        self._validate_format(response_format)
+        
+        # 哈希和解码涉及文件读取和 CPU 计算, 放到线程中执行
+        cache = get_inference_cache()
+        cache_key = cache.make_key(
+            await _run_in_asr_executor(cache.hash_audio, audio_file),
+            self.model_name, language, target_language, response_format, timestamps,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("命中推理缓存, 跳过推理")
+            return cached
+        
+        # 缓存未命中: 模型冷启动时与音频解码并行加载
+        _prefetch_model(self.model_name)
+        
+        audio = await _run_in_asr_executor(self._decode, audio_file, filename)
+        
+        result = await self._infer_async(
+            audio=audio,
+            duration=get_audio_duration_from_array(audio),
+            source=filename,
+            language=language,
+            response_format=response_format,
+            timestamps=timestamps,
+            target_language=target_language,
+        )
+        
+        cache.put(cache_key, result)
+        return result
+    
+    def _decode(self, audio_file: BinaryIO, filename: str) -> np.ndarray:
+        """
+        将上传的音频解码为 16kHz 单声道数组
+        
+        Raises:
+            RuntimeError: 解码失败
+        """
+        suffix = Path(filename).suffix.lower() or ".wav"
+        try:
+            return decode_audio(audio_file, suffix=suffix)
+        except Exception as e:
+            logger.error(f"音频解码失败: {e}")
+            raise RuntimeError(f"音频解码失败: {e}") from e
+    
+    def _infer(
+        self,
+        audio: AudioInput,
+        duration: Optional[float],
+        source: str,
+        language: Optional[str],
+        response_format: str,
+        timestamps: bool,
+        target_language: Optional[str],
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        同步推理入口
+        
+        如果批处理调度器正在其他线程的事件循环中运行, 请求会提交给调度器
+        与并发请求合并推理; 否则直接执行单条推理。
+        
+        Args:
+            audio: 音频文件路径或 16kHz 单声道数组
+            duration: 音频时长
+            source: 音频来源描述 (用于日志)
+            
+        Returns:
+            格式化的转录结果
+        """
+        scheduler_loop = get_batch_scheduler().loop
+        if scheduler_loop is not None and not _is_running_in_loop(scheduler_loop):
+            future = asyncio.run_coroutine_threadsafe(
+                self._infer_async(
+                    audio, duration, source, language, response_format, timestamps, target_language
+                ),
+                scheduler_loop,
+            )
+            return future.result()
+        
+        source_lang, target_lang, need_timestamps = self._resolve_options(
+            source, language, response_format, timestamps, target_language
+        )
         
         try:
-            # 从文件名获取后缀
-            suffix = Path(filename).suffix.lower() or ".wav"
+            # 调度器未运行 (如脚本中直接调用), 执行单条推理
+            outputs = run_batch_inference(
+                self.model_name, [audio], source_lang, target_lang, need_timestamps
+            )
             
-            # 保存到临时文件
-            temp_path = save_audio_to_temp(audio_bytes, suffix=suffix)
+            return self._build_response(
+                outputs[0] if outputs else None, source_lang, duration, response_format
+            )
             
-            # 如果不是 WAV 格式, 需要转换
-            if suffix not in {".wav", ".flac"}:
-                logger.info(f"将 {suffix} 格式转换为 WAV...")
-                converted_path = convert_audio_to_wav(temp_path)
-                audio_path = converted_path
-            else:
-                audio_path = temp_path
+        except Exception as e:
+            logger.error(f"转录失败: {e}")
+            raise RuntimeError(f"转录失败: {e}") from e
+    
+    async def _infer_async(
+        self,
+        audio: AudioInput,
+        duration: Optional[float],
+        source: str,
+        language: Optional[str],
+        response_format: str,
+        timestamps: bool,
+        target_language: Optional[str],
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        异步推理入口, 经由批处理调度器执行
+        
+        Args:
+            参见 _infer
             
-            # 执行转录
-            result = self.transcribe(
-                audio_path=audio_path,
-                language=language,
-                response_format=response_format,
-                timestamps=timestamps,
-                target_language=target_language,
+        Returns:
+            格式化的转录结果
+        """
+        source_lang, target_lang, need_timestamps = self._resolve_options(
+            source, language, response_format, timestamps, target_language
+        )
+        
+        try:
+            output = await get_batch_scheduler().submit(
+                model_name=self.model_name,
+                audio=audio,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                timestamps=need_timestamps,
+                duration=duration,
             )
             
-            return result
+            # 长音频的字幕/详细 JSON 格式化有一定 CPU 开销, 放到线程中执行, 不阻塞事件循环
+            return await _run_in_asr_executor(
+                self._build_response, output, source_lang, duration, response_format
+            )
             
-        finally:
-            # 清理临时文件
-            if temp_path:
-                cleanup_temp_file(temp_path)
-            if converted_path and converted_path != temp_path:
-                cleanup_temp_file(converted_path)
+        except Exception as e:
+            logger.error(f"转录失败: {e}")
+            raise RuntimeError(f"转录失败: {e}") from e
+    
+    def _validate_format(self, response_format: str) -> None:
+        """
+        验证响应格式
+        
+        Raises:
+            ValueError: 不支持的响应格式
+        """
+        if response_format not in self.SUPPORTED_FORMATS:
+            raise ValueError(
+                f"不支持的响应格式: {response_format}, "
+                f"支持的格式: {', '.join(sorted(self.SUPPORTED_FORMATS))}"
+            )
+    
+    def _resolve_options(
+        self,
+        source: str,
+        language: Optional[str],
+        response_format: str,
+        timestamps: bool,
+        target_language: Optional[str],
+    ) -> Tuple[str, str, bool]:
+        """
+        解析推理参数
+        
+        Returns:
+            (源语言, 目标语言, 是否需要时间戳)
+        """
+        # 标准化语言代码
+        source_lang = normalize_language_code(language)
+        target_lang = normalize_language_code(target_language) if target_language else source_lang
+        
+        # 确定是否需要时间戳 (SRT/VTT 格式必须启用)
+        need_timestamps = timestamps or response_format in {"srt", "vtt", "verbose_json"}
+        
+        logger.info(
+            f"开始转录 - 文件: {source}, "
+            f"源语言: {source_lang}, 目标语言: {target_lang}, "
+            f"格式: {response_format}, 时间戳: {need_timestamps}"
+        )
+        
+        return source_lang, target_lang, need_timestamps
+    
+    def _build_response(
+        self,
+        result: Any,
+        language: str,
+        duration: Optional[float],
+        response_format: str,
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        从单条模型输出中提取文本和时间戳, 并生成响应
+        
+        Args:
+            result: 模型输出 (Hypothesis), 无输出时为 None
+            language: 语言代码
+            duration: 音频时长
+            response_format: 响应格式
+            
+        Returns:
+            格式化的响应
+        """
+        segments = segments_from_nemo([])
+        words = []
+        
+        if result is not None:
+            text = result.text if hasattr(result, 'text') else str(result)
+            
+            # 提取时间戳信息
+            if hasattr(result, 'timestamp') and result.timestamp:
+                if 'segment' in result.timestamp:
+                    # 分段只转换一次, 后续格式化按列读取
+                    segments = segments_from_nemo(result.timestamp['segment'])
+                if 'word' in result.timestamp:
+                    words = result.timestamp['word']
+        else:
+            text = ""
+        
+        logger.info(f"转录完成 - 文本长度: {len(text)}, 分段数: {len(segments.texts)}")
+        
+        # 根据格式生成响应
+        return self._format_response(
+            text=text,
+            segments=segments,
+            words=words,
+            language=language,
+            duration=duration,
+            response_format=response_format
+        )
     
     def _format_response(
         self,
         text: str,
-        segments: List[Dict[str, Any]],
+        segments: SegmentArray,
         words: List[Dict[str, Any]],
         language: str,
         duration: Optional[float],
@@ -236,7 +614,7 @@ class TranscriptionEngine:
         
         Args:
             text: 完整转录文本
-            segments: 分段时间戳列表
+            segments: 分段时间戳
             words: 词级时间戳列表
             language: 语言代码
             duration: 音频时长
@@ -257,14 +635,14 @@ class TranscriptionEngine:
             )
         
         elif response_format == "srt":
-            if not segments:
-                # 没有时间戳信息, 创建单个分段
-                segments = [{"start": 0, "end": duration or 0, "segment": text}]
+            if not segments.texts:
+                # 没有时间戳信息, 输出覆盖整段音频的单条字幕
+                return _SRT_SINGLE.format(end=format_timestamp_srt(duration or 0), text=text)
             return segments_to_srt(segments)
         
         elif response_format == "vtt":
-            if not segments:
-                segments = [{"start": 0, "end": duration or 0, "segment": text}]
+            if not segments.texts:
+                return _VTT_SINGLE.format(end=format_timestamp_vtt(duration or 0), text=text)
             return segments_to_vtt(segments)
         
         elif response_format == "verbose_json":
@@ -289,10 +667,14 @@ class TranslationEngine:
     支持从任意源语言翻译到英语, 或从英语翻译到其他语言
     """
     
-    def __init__(self):
-        """初始化翻译引擎"""
-        self.model_manager = get_model_manager()
-        logger.info("翻译引擎初始化完成")
+    def __init__(self, model_name: str = "canary-1b-v2"):
+        """
+        初始化翻译引擎
+        
+        Args:
+            model_name: 使用的模型名称
+        """
+        self.model_name = model_name
     
     def translate(
         self,
@@ -313,9 +695,8 @@ class TranslationEngine:
         Returns:
             翻译结果
         """
-        # 使用转录引擎, 设置不同的源和目标语言
-        engine = TranscriptionEngine()
-        return engine.transcribe(
+        # 复用转录引擎实例, 设置不同的源和目标语言
+        return get_transcription_engine(self.model_name).transcribe(
             audio_path=audio_path,
             language=source_language,
             target_language=target_language,
@@ -324,18 +705,47 @@ class TranslationEngine:
         )
 
 
-# 全局引擎实例
-_transcription_engine: Optional[TranscriptionEngine] = None
+# 全局引擎实例 (按模型名称缓存)
+_transcription_engines: Dict[str, TranscriptionEngine] = {}
+_translation_engine: Optional[TranslationEngine] = None
+_engine_lock = threading.Lock()
 
 
 def get_transcription_engine(model_name: str = "canary-1b-v2") -> TranscriptionEngine:
     """
     获取转录引擎实例
     
+    引擎本身无请求状态, 每个模型只创建一个实例, 避免每个请求重复初始化
+    
     Args:
         model_name: 模型名称
         
     Returns:
         TranscriptionEngine 实例
     """
-    return TranscriptionEngine(model_name=model_name)
+    engine = _transcription_engines.get(model_name)
+    if engine is None:
+        with _engine_lock:
+            engine = _transcription_engines.get(model_name)
+            if engine is None:
+                engine = TranscriptionEngine(model_name=model_name)
+                _transcription_engines[model_name] = engine
+    
+    return engine
+
+
+def get_translation_engine() -> TranslationEngine:
+    """
+    获取翻译引擎单例
+    
+    Returns:
+        TranslationEngine 实例
+    """
+    global _translation_engine
+    
+    if _translation_engine is None:
+        with _engine_lock:
+            if _translation_engine is None:
+                _translation_engine = TranslationEngine()
+    
+    return _translation_engine
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+推理结果缓存模块
+
+对相同音频内容和相同参数的请求直接返回缓存结果, 跳过 GPU 推理:
+- 以音频内容哈希 + 推理参数作为缓存键
+- LRU 淘汰策略, 容量可配置
+- 支持 off / read_only / write_only / on 四种缓存模式
+- 线程安全
+"""
+
+import os
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Any, Hashable, Tuple, Union, BinaryIO
+
+from loguru import logger
+
+
+class InferenceCache:
+    """
+    推理结果 LRU 缓存
+
+    缓存模式:
+    - off: 不读不写
+    - read_only: 只读取已有缓存, 不写入新结果
+    - write_only: 只写入结果, 不从缓存读取
+    - on: 读写均启用
+
+    使用示例:
+        cache = get_inference_cache()
+        digest = cache.hash_audio(audio_bytes)
+        key = cache.make_key(digest, "canary-1b-v2", "en", None, "json", True)
+        result = cache.get(key)
+        if result is None:
+            result = ...
+            cache.put(key, result)
+    """
+
+    # 支持的缓存模式
+    SUPPORTED_MODES = {"off", "read_only", "write_only", "on"}
+
+    def __init__(self, maxsize: Optional[int] = None, mode: Optional[str] = None):
+        """
+        初始化推理缓存
+
+        Args:
+            maxsize: 最大缓存条目数, 默认从环境变量 ASR_CACHE_SIZE 读取
+            mode: 缓存模式, 默认从环境变量 ASR_CACHE_MODE 读取
+        """
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv("ASR_CACHE_SIZE", "512"))
+        mode = (mode or os.getenv("ASR_CACHE_MODE", "on")).lower().strip()
+        if mode not in self.SUPPORTED_MODES:
+            logger.warning(f"未知的缓存模式 '{mode}', 使用默认值 'on'")
+            mode = "on"
+        self.mode = mode
+
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        logger.info(f"推理缓存初始化完成 - 容量: {self.maxsize}, 模式: {self.mode}")
+
+    @property
+    def readable(self) -> bool:
+        """是否允许从缓存读取"""
+        return self.mode in {"on", "read_only"} and self.maxsize > 0
+
+    @property
+    def writable(self) -> bool:
+        """是否允许写入缓存"""
+        return self.mode in {"on", "write_only"} and self.maxsize > 0
+
+    @staticmethod
+    def hash_audio(source: Union[bytes, BinaryIO], chunk_size: int = 1024 * 1024) -> bytes:
+        """
+        计算音频内容哈希
+
+        Args:
+            source: 音频字节内容, 或可 seek 的二进制文件对象
+            chunk_size: 分块读取大小, 文件对象按块计算, 不整体读入内存
+
+        Returns:
+            16 字节 blake2b 摘要
+        """
+        if isinstance(source, (bytes, bytearray)):
+            return hashlib.blake2b(source, digest_size=16).digest()
+
+        hasher = hashlib.blake2b(digest_size=16)
+        source.seek(0)
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            hasher.update(chunk)
+        source.seek(0)
+        return hasher.digest()
+
+    @staticmethod
+    def make_key(
+        audio_digest: bytes,
+        model_name: str,
+        language: Optional[str],
+        target_language: Optional[str],
+        response_format: str,
+        timestamps: bool,
+    ) -> Tuple[bytes, str, Optional[str], Optional[str], str, bool]:
+        """
+        生成缓存键
+
+        Args:
+            audio_digest: 音频内容哈希, 由 hash_audio 计算
+            model_name: 模型名称
+            language: 源语言代码
+            target_language: 目标语言代码
+            response_format: 响应格式
+            timestamps: 是否提取时间戳
+
+        Returns:
+            可哈希的缓存键
+        """
+        return (audio_digest, model_name, language, target_language, response_format, timestamps)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        读取缓存结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存结果的副本, 未命中或不可读时返回 None
+        """
+        if not self.readable:
+            return None
+
+        with self._lock:
+            if key not in self._cache:
+                self._misses += 1
+                return None
+
+            self._cache.move_to_end(key)
+            self._hits += 1
+            result = self._cache[key]
+
+        # 字典结果返回副本, 避免调用方修改缓存内容
+        return copy.deepcopy(result) if isinstance(result, dict) else result
+
+    def put(self, key: Hashable, result: Any) -> None:
+        """
+        写入缓存结果
+
+        Args:
+            key: 缓存键
+            result: 转录结果
+        """
+        if not self.writable:
+            return
+
+        stored = copy.deepcopy(result) if isinstance(result, dict) else result
+
+        with self._lock:
+            self._cache[key] = stored
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> int:
+        """
+        清空缓存并重置统计
+
+        Returns:
+            被清除的条目数
+        """
+        with self._lock:
+            count = len(self._cache)
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+        logger.info(f"推理缓存已清空, 共清除 {count} 条")
+        return count
+
+    def get_stats(self) -> dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            包含容量、命中率等信息的字典
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "mode": self.mode,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+# 全局单例实例
+_inference_cache: Optional[InferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_inference_cache() -> InferenceCache:
+    """
+    获取推理缓存单例
+
+    Returns:
+        InferenceCache 实例
+    """
+    global _inference_cache
+
+    if _inference_cache is None:
+        with _cache_lock:
+            if _inference_cache is None:
+                _inference_cache = InferenceCache()
+
+    return _inference_cache
@@ -8,23 +8,30 @@ FastAPI 主应用模块
 - GET /status - 模型状态
 - POST /model/load - 预加载模型
 - POST /model/unload - 卸载模型
+- GET /cache/stats - 推理缓存统计
+- POST /cache/clear - 清空推理缓存
 """
 
 import os
 import sys
+import asyncio
 from typing import Optional, List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Query, Header, Depends
-from fastapi.responses import PlainTextResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends
+from fastapi.responses import PlainTextResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from loguru import logger
+import orjson
 
 from .multi_model_manager import get_multi_model_manager, shutdown_multi_model_manager
-from .model_manager import get_model_manager, shutdown_model_manager
-from .engine import get_transcription_engine
+from .model_manager import get_model_manager
+from .engine import TranscriptionEngine, get_transcription_engine, get_asr_executor, shutdown_asr_executor
+from .batch_scheduler import get_batch_scheduler, shutdown_batch_scheduler
+from .inference_cache import get_inference_cache
+from .utils import prepare_timestamp_formatter
 
 
 # ============================================================================
@@ -99,6 +106,71 @@ def verify_api_key(credentials: Optional[HTTPAuthorizationCredentials] = Depends
     return credentials.credentials
 
 
+# ============================================================================
+# 响应序列化
+# ============================================================================
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """
+    基于 orjson 的 JSON 响应
+    
+    orjson 为 C 扩展, 序列化 verbose_json 中较长的 segments/words 列表明显快于
+    标准库 json; 同时开启 OPT_SERIALIZE_NUMPY, 兼容模型时间戳中的 numpy 数值类型
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# ============================================================================
+# 上传文件校验
+# ============================================================================
+
+# 支持的响应格式 (与转录引擎保持一致)
+VALID_FORMATS = TranscriptionEngine.SUPPORTED_FORMATS
+
+# 已知的音频 MIME 类型 (仅用于日志, 不做强制校验)
+ALLOWED_CONTENT_TYPES = frozenset({
+    "audio/wav", "audio/wave", "audio/x-wav",
+    "audio/flac", "audio/x-flac",
+    "audio/mpeg", "audio/mp3",
+    "audio/mp4", "audio/m4a", "audio/x-m4a",
+    "audio/ogg", "audio/webm",
+    "application/octet-stream",  # 允许未知类型
+})
+
+
+def validate_upload_size(file: UploadFile) -> int:
+    """
+    校验上传文件大小, 不读取文件内容
+    
+    上传文件已由 Starlette 缓存在 SpooledTemporaryFile 中 (大文件自动落盘),
+    这里只读取其大小, 后续直接从该文件对象流式解码, 避免整体读入内存。
+    
+    如果设置了 MAX_UPLOAD_MB 环境变量, 超出限制时返回 413
+    
+    Returns:
+        文件大小 (字节)
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+    
+    if size == 0:
+        raise HTTPException(status_code=400, detail="上传的文件为空")
+    
+    max_upload_mb = float(os.getenv("MAX_UPLOAD_MB", "0"))
+    if max_upload_mb > 0 and size > max_upload_mb * 1024 * 1024:
+        raise HTTPException(
+            status_code=413,
+            detail=f"上传的文件过大: {size} bytes, 限制: {max_upload_mb}MB"
+        )
+    
+    return size
+
+
 # ============================================================================
 # 应用生命周期管理
 # ============================================================================
@@ -132,13 +204,21 @@ async def lifespan(app: FastAPI):
         logger.warning("API Key 验证: 未启用 (建议设置 API_KEY 环境变量)")
     
     # 初始化多模型管理器 (仅创建实例, 不加载模型)
-    _ = get_multi_model_manager()
+    get_multi_model_manager().bind_event_loop(asyncio.get_running_loop())
     logger.info("多模型管理器已就绪 (懒加载模式, 首次请求时加载对应模型)")
     
+    # 启动批处理调度器, 合并并发的转录请求
+    get_batch_scheduler().start()
+    
+    # 在后台线程中编译 Numba 时间戳格式化函数, 编译完成前请求使用 NumPy 路径
+    get_asr_executor().submit(prepare_timestamp_formatter)
+    
     yield
     
     # 关闭时执行
     logger.info("=== 正在关闭 API 服务 ===")
+    await shutdown_batch_scheduler()
+    shutdown_asr_executor()
     shutdown_multi_model_manager()
     logger.info("API 服务已关闭")
 
@@ -165,6 +245,7 @@ app = FastAPI(
 en, de, fr, es, it, pt, nl, pl, ru, uk, cs, sk, bg, hr, da, fi, el, hu, ro, sv, et, lv, lt, sl, mt
     """,
     lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse,
 )
 
 # 配置 CORS
@@ -201,6 +282,7 @@ class VerboseTranscriptionResponse(BaseModel):
 class ModelStatusResponse(BaseModel):
     """模型状态响应"""
     model_loaded: bool
+    offloaded_to_cpu: bool = False
     model_name: str
     model_path: str
     usage_count: int
@@ -239,6 +321,16 @@ class ModelListResponse(BaseModel):
     data: List[ModelInfo] = Field(..., description="模型列表")
 
 
+class CacheStatsResponse(BaseModel):
+    """推理缓存统计响应"""
+    mode: str
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_rate: float
+
+
 # ============================================================================
 # API 路由
 # ============================================================================
@@ -251,20 +343,21 @@ async def root():
     return "NVIDIA ASR to OpenAI API - 兼容 OpenAI Whisper API 的语音识别服务"
 
 
-@app.get("/health", response_model=HealthResponse)
+@app.get("/health", responses={200: {"model": HealthResponse}})
 async def health_check():
     """
     健康检查端点
     
     用于 Docker 健康检查和负载均衡器探测
     """
-    return HealthResponse(
-        status="healthy",
-        message="服务运行正常"
-    )
+    # 高频轮询的端点直接返回字典, 跳过 Pydantic 校验, 响应模型仅用于文档
+    return {
+        "status": "healthy",
+        "message": "服务运行正常",
+    }
 
 
-@app.get("/v1/models", response_model=ModelListResponse)
+@app.get("/v1/models", responses={200: {"model": ModelListResponse}})
 async def list_models(api_key: Optional[str] = Depends(verify_api_key)):
     """
     获取可用模型列表
@@ -276,22 +369,22 @@ async def list_models(api_key: Optional[str] = Depends(verify_api_key)):
     enabled_models = multi_manager.get_enabled_models()
     
     models_data = [
-        ModelInfo(
-            id=model_name,
-            object="model",
-            created=1699000000,
-            owned_by="nvidia"
-        )
+        {
+            "id": model_name,
+            "object": "model",
+            "created": 1699000000,
+            "owned_by": "nvidia",
+        }
         for model_name in enabled_models
     ]
     
-    return ModelListResponse(
-        object="list",
-        data=models_data
-    )
+    return {
+        "object": "list",
+        "data": models_data,
+    }
 
 
-@app.get("/status", response_model=ModelStatusResponse)
+@app.get("/status", responses={200: {"model": ModelStatusResponse}})
 async def get_status():
     """
     获取模型状态
@@ -299,8 +392,7 @@ async def get_status():
     返回模型加载状态、GPU 使用情况等信息
     """
     manager = get_model_manager()
-    status = manager.get_status()
-    return ModelStatusResponse(**status)
+    return manager.get_status()
 
 
 @app.post("/model/load", response_model=OperationResponse)
@@ -312,7 +404,7 @@ async def load_model():
     """
     try:
         manager = get_model_manager()
-        success = manager.force_load()
+        success = await manager.aforce_load()
         
         if success:
             return OperationResponse(
@@ -355,6 +447,28 @@ async def unload_model():
         raise HTTPException(status_code=500, detail=f"卸载模型失败: {e}")
 
 
+@app.get("/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats(api_key: Optional[str] = Depends(verify_api_key)):
+    """
+    获取推理缓存统计
+    
+    返回缓存模式、条目数和命中率等信息
+    """
+    return CacheStatsResponse(**get_inference_cache().get_stats())
+
+
+@app.post("/cache/clear", response_model=OperationResponse)
+async def clear_cache(api_key: Optional[str] = Depends(verify_api_key)):
+    """
+    清空推理缓存
+    """
+    count = get_inference_cache().clear()
+    return OperationResponse(
+        success=True,
+        message=f"推理缓存已清空, 共清除 {count} 条"
+    )
+
+
 @app.post("/v1/audio/transcriptions")
 async def create_transcription(
     file: UploadFile = File(..., description="要转录的音频文件"),
@@ -409,44 +523,35 @@ async def create_transcription(
         )
     
     # 验证响应格式
-    valid_formats = {"text", "json", "srt", "vtt", "verbose_json"}
-    if response_format not in valid_formats:
+    if response_format not in VALID_FORMATS:
         raise HTTPException(
             status_code=400,
-            detail=f"不支持的响应格式: {response_format}, 支持: {valid_formats}"
+            detail=f"不支持的响应格式: {response_format}, 支持: {', '.join(sorted(VALID_FORMATS))}"
         )
     
     # 验证文件类型
     if file.content_type:
-        allowed_types = {
-            "audio/wav", "audio/wave", "audio/x-wav",
-            "audio/flac", "audio/x-flac",
-            "audio/mpeg", "audio/mp3",
-            "audio/mp4", "audio/m4a", "audio/x-m4a",
-            "audio/ogg", "audio/webm",
-            "application/octet-stream",  # 允许未知类型
-        }
         # 放宽类型检查, 允许更多格式
-        logger.debug(f"文件类型: {file.content_type}")
+        if file.content_type not in ALLOWED_CONTENT_TYPES:
+            logger.debug("未知的文件类型: {}", file.content_type)
+        else:
+            logger.debug("文件类型: {}", file.content_type)
     
     try:
-        # 读取文件内容
-        audio_bytes = await file.read()
-        
-        if len(audio_bytes) == 0:
-            raise HTTPException(status_code=400, detail="上传的文件为空")
+        # 校验文件大小 (不读取文件内容)
+        file_size = validate_upload_size(file)
         
         logger.info(
             f"收到转录请求 - 文件: {file.filename}, "
             f"模型: {model}, "
-            f"大小: {len(audio_bytes)} bytes, "
+            f"大小: {file_size} bytes, "
             f"语言: {language}, 格式: {response_format}"
         )
         
         # 获取转录引擎并执行转录
         engine = get_transcription_engine(model_name=model)
-        result = engine.transcribe_bytes(
-            audio_bytes=audio_bytes,
+        result = await engine.transcribe_file_async(
+            audio_file=file.file,
             filename=file.filename or "audio.wav",
             language=language,
             response_format=response_format,
@@ -457,7 +562,7 @@ async def create_transcription(
         if response_format in {"text", "srt", "vtt"}:
             return PlainTextResponse(content=result, media_type="text/plain")
         else:
-            return JSONResponse(content=result)
+            return NumpyORJSONResponse(content=result)
         
     except HTTPException:
         raise
@@ -490,28 +595,33 @@ async def create_translation(
     
     翻译后的英语文本
     """
-    valid_formats = {"text", "json", "srt", "vtt", "verbose_json"}
-    if response_format not in valid_formats:
+    # 验证模型名称
+    multi_manager = get_multi_model_manager()
+    enabled_models = multi_manager.get_enabled_models()
+    if model not in enabled_models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的模型: {model}, 当前启用的模型: {enabled_models}"
+        )
+    
+    if response_format not in VALID_FORMATS:
         raise HTTPException(
             status_code=400,
             detail=f"不支持的响应格式: {response_format}"
         )
     
     try:
-        audio_bytes = await file.read()
-        
-        if len(audio_bytes) == 0:
-            raise HTTPException(status_code=400, detail="上传的文件为空")
+        file_size = validate_upload_size(file)
         
         logger.info(
             f"收到翻译请求 - 文件: {file.filename}, "
-            f"大小: {len(audio_bytes)} bytes, 格式: {response_format}"
+            f"大小: {file_size} bytes, 格式: {response_format}"
         )
         
         # 翻译任务: 源语言设为英语 (会自动检测), 目标语言设为英语
         engine = get_transcription_engine(model_name=model)
-        result = engine.transcribe_bytes(
-            audio_bytes=audio_bytes,
+        result = await engine.transcribe_file_async(
+            audio_file=file.file,
             filename=file.filename or "audio.wav",
             language="en",  # Canary 会自动检测源语言
             response_format=response_format,
@@ -522,7 +632,7 @@ async def create_translation(
         if response_format in {"text", "srt", "vtt"}:
             return PlainTextResponse(content=result, media_type="text/plain")
         else:
-            return JSONResponse(content=result)
+            return NumpyORJSONResponse(content=result)
         
     except HTTPException:
         raise
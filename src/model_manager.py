@@ -7,18 +7,26 @@
 - 自动卸载 (Auto-Unload): 超时未使用时释放显存
 - 线程安全: 确保并发请求安全
 - 智能下载: 优先使用本地模型, 否则从 HuggingFace 下载
+
+torch 和 NeMo 均在首次使用时导入, 导入本模块不会加载 CUDA 相关库
 """
 
 import os
 import time
+import asyncio
 import threading
-from typing import Optional, Any
-from pathlib import Path
+from typing import Optional, Any, Callable, List, Tuple
 from contextlib import contextmanager
 
-import torch
 from loguru import logger
 
+# 按需加载 CUDA 内核, 首次初始化 CUDA 时不一次性加载全部模块 (须在导入 torch 前设置)
+os.environ.setdefault("CUDA_MODULE_LOADING", "LAZY")
+
+# 可扩展显存段: 不同长度音频的激活张量复用同一段虚拟地址并按需扩展,
+# 避免缓存分配器产生碎片以及反复 cudaMalloc (须在初始化 CUDA 前设置)
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
 
 class ModelManager:
     """
@@ -26,7 +34,7 @@ class ModelManager:
     
     负责模型的生命周期管理, 包括:
     - 懒加载模型到 GPU
-    - 自动在超时后卸载模型释放显存
+    - 闲置超时后自动卸载模型释放显存 (定时器驱动, 空闲时无后台轮询)
     - 线程安全的模型访问
     
     属性:
@@ -74,24 +82,92 @@ class ModelManager:
         # 模型实例
         self._model: Optional[Any] = None
         
-        # 线程锁: 保护模型加载和卸载操作
-        self._lock = threading.RLock()
+        # 线程锁: 保护模型实例、使用计数等状态, 不在加载期间持有
+        self._lock = threading.Lock()
+        
+        # 加载锁: 串行化耗时的模型加载, 加载期间状态查询不会被阻塞
+        self._load_lock = threading.Lock()
+        
+        # 异步加载锁: 在事件循环中首次使用时创建, 并发的异步调用方只占用一个工作线程
+        self._aio_lock: Optional[asyncio.Lock] = None
         
         # 使用计数器: 当前有多少请求正在使用模型
         self._usage_count = 0
         
-        # 最后使用时间戳
+        # 最后使用时间 (time.monotonic)
         self._last_used_time: float = 0
         
-        # 超时监控线程
-        self._monitor_thread: Optional[threading.Thread] = None
-        self._monitor_stop_event = threading.Event()
+        # 闲置超时卸载: 使用计数归零时安排定时器, 不再使用轮询线程
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._idle_timer: Optional[threading.Timer] = None
+        self._idle_generation = 0
         
         # 模型加载状态
         self._is_loading = False
         
+        # 由多模型管理器设置: 重新加载时经其加载, 先按 LRU 和显存预算卸载其他模型
+        self._loader: Optional[Callable[["ModelManager"], Any]] = None
+        
+        # 推理精度 (fp32 / fp16 / bf16), 加载模型时确定, 避免启动时初始化 CUDA
+        self.precision: Optional[str] = None
+        
+        # 已加载模型的参数显存占用(字节), 供多模型管理器估算显存预算
+        self._model_bytes = 0
+        
+        # 卸载时将权重暂存到锁页内存, 再次加载时直接拷回显存, 跳过 restore_from
+        self.offload_to_cpu = os.getenv("MODEL_OFFLOAD_CPU", "false").lower() == "true"
+        self._offloaded_model: Optional[Any] = None
+        self._cpu_weights: Optional[dict] = None
+        
+        # 卸载时保留模型结构, 再次加载时只从 .nemo 文件读取权重 (不占用额外主机内存)
+        self.keep_skeleton = os.getenv("MODEL_KEEP_SKELETON", "false").lower() == "true"
+        self._skeleton_buffers: Optional[dict] = None
+        
+        # 预热音频时长(秒), 设为最长请求时长可让缓存分配器在加载阶段一次扩展到稳态
+        self.warmup_seconds = float(os.getenv("MODEL_WARMUP_SECONDS", "1"))
+        
+        # 模型目录扫描结果缓存: (目录 mtime, 扫描结果)
+        self._scan_cache: Optional[Tuple[int, Tuple[List[str], bool]]] = None
+        
         logger.info(f"模型管理器初始化完成 - 模型路径: {self.model_path}, 超时时间: {self.timeout_sec}秒")
     
+    def _scan_model_dir(self) -> Tuple[List[str], bool]:
+        """
+        单次扫描模型目录
+        
+        使用 os.scandir 一次遍历得到所有信息, DirEntry 自带文件类型,
+        不需要对每个条目额外 stat, 也不需要多次 glob 重复遍历目录。
+        结果按目录 mtime 缓存, 目录内容变化 (如手动放入模型文件) 后自动重新扫描
+        
+        Returns:
+            (.nemo 文件路径列表, 是否存在 yaml/json 配置文件)
+        """
+        try:
+            mtime = os.stat(self.model_path).st_mtime_ns
+        except OSError:
+            return [], False
+        
+        if self._scan_cache is not None and self._scan_cache[0] == mtime:
+            nemo_files, has_config = self._scan_cache[1]
+            return list(nemo_files), has_config
+        
+        nemo_files = []
+        has_config = False
+        
+        try:
+            with os.scandir(self.model_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".nemo"):
+                        nemo_files.append(entry.path)
+                    elif entry.name.endswith((".yaml", ".json")):
+                        has_config = True
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        
+        self._scan_cache = (mtime, (list(nemo_files), has_config))
+        return nemo_files, has_config
+    
     def _check_local_model_exists(self) -> bool:
         """
         检查本地是否已存在模型文件
@@ -99,20 +175,54 @@ class ModelManager:
         Returns:
             如果本地存在模型文件返回 True
         """
-        model_dir = Path(self.model_path)
+        nemo_files, has_config = self._scan_model_dir()
         
-        # 检查目录是否存在且不为空
-        if model_dir.exists() and model_dir.is_dir():
-            # 检查是否有 .nemo 文件或模型配置文件
-            nemo_files = list(model_dir.glob("*.nemo"))
-            config_files = list(model_dir.glob("*.yaml")) + list(model_dir.glob("*.json"))
-            
-            if nemo_files or config_files:
-                logger.info(f"检测到本地模型文件: {model_dir}")
-                return True
+        # 检查是否有 .nemo 文件或模型配置文件
+        if nemo_files or has_config:
+            logger.info(f"检测到本地模型文件: {self.model_path}")
+            return True
         
         return False
     
+    def _expected_nemo_path(self) -> str:
+        """
+        本模型对应的 .nemo 文件路径
+        
+        使用 nemo_filename, 未指定时由模型名生成 (如 canary-1b-v2.nemo)
+        """
+        filename = self.nemo_filename or self.model_name.split("/")[-1] + ".nemo"
+        return os.path.join(self.model_path, filename)
+    
+    def _find_local_nemo(self) -> Optional[str]:
+        """
+        查找本地 .nemo 文件
+        
+        优先直接检查本模型对应的文件名 (单次 stat)。多个模型共用同一目录时,
+        目录中其他模型的 .nemo 文件不能作为本模型使用, 因此只有未指定
+        nemo_filename 时才回退为扫描目录中的任意 .nemo 文件
+        
+        Returns:
+            .nemo 文件路径, 不存在时返回 None
+        """
+        expected = self._expected_nemo_path()
+        if os.path.isfile(expected):
+            return expected
+        
+        if self.nemo_filename:
+            return None
+        
+        nemo_files, _ = self._scan_model_dir()
+        return nemo_files[0] if nemo_files else None
+    
+    def get_local_nemo_path(self) -> Optional[str]:
+        """
+        本模型的本地 .nemo 文件路径
+        
+        Returns:
+            文件路径, 本地不存在时返回 None
+        """
+        return self._find_local_nemo()
+    
     def _get_model_source(self) -> str:
         """
         确定模型加载源
@@ -120,17 +230,181 @@ class ModelManager:
         Returns:
             本地路径或 HuggingFace 模型名称
         """
-        if self._check_local_model_exists():
-            # 查找本地 .nemo 文件
-            nemo_files = list(Path(self.model_path).glob("*.nemo"))
-            if nemo_files:
-                return str(nemo_files[0])
+        local_nemo = self._find_local_nemo()
+        if local_nemo is not None:
+            logger.info(f"检测到本地模型文件: {local_nemo}")
+            return local_nemo
+        
+        _, has_config = self._scan_model_dir()
+        if has_config:
+            logger.info(f"检测到本地模型文件: {self.model_path}")
             return self.model_path
         
         # 使用 HuggingFace 模型, 下载到指定路径
         logger.info(f"本地未找到模型, 将从 HuggingFace 下载: {self.model_name}")
         return self.model_name
     
+    @property
+    def is_loaded(self) -> bool:
+        """模型是否已加载"""
+        return self._model is not None
+    
+    @property
+    def is_loading(self) -> bool:
+        """模型是否正在加载"""
+        return self._is_loading
+    
+    @property
+    def is_idle(self) -> bool:
+        """当前是否没有请求正在使用模型"""
+        return self._usage_count == 0
+    
+    @property
+    def last_used_time(self) -> float:
+        """最后使用时间 (time.monotonic)"""
+        return self._last_used_time
+    
+    def estimate_model_bytes(self) -> int:
+        """
+        估算模型加载后的显存占用
+        
+        已加载过的模型使用实际参数大小; 否则以本地 .nemo 文件大小作为估计
+        (文件中为 FP32 权重, 半精度加载时偏保守)
+        
+        Returns:
+            估算的字节数, 无法估算时返回 0
+        """
+        if self._model_bytes:
+            return self._model_bytes
+        
+        local_nemo = self._find_local_nemo()
+        if local_nemo is None:
+            return 0
+        
+        try:
+            return os.path.getsize(local_nemo)
+        except OSError:
+            return 0
+    
+    def _download_nemo_file(self, repo_id: str, filename: str) -> Optional[str]:
+        """
+        从 HuggingFace 仓库下载 .nemo 文件到本地模型目录
+        
+        Args:
+            repo_id: HuggingFace 仓库名称
+            filename: 仓库中的 .nemo 文件名
+        
+        Returns:
+            本地文件路径, 仓库中不存在该文件或下载失败时返回 None
+        """
+        from huggingface_hub import hf_hub_download
+        
+        try:
+            os.makedirs(self.model_path, exist_ok=True)
+            local_file = hf_hub_download(
+                repo_id=repo_id,
+                filename=filename,
+                local_dir=self.model_path,
+            )
+            logger.info(f"模型文件已下载到本地: {local_file}")
+            return local_file
+        except Exception as e:
+            logger.warning(f"直接下载 {filename} 失败, 改用 from_pretrained: {e}")
+            return None
+    
+    def _resolve_precision(self) -> str:
+        """
+        确定推理精度
+        
+        优先使用环境变量 ASR_PRECISION (bf16 / fp16 / fp32);
+        未设置时, 启用 FP16 的情况下 Ampere 及更新的 GPU 使用 bf16, 其余使用 fp16。
+        fp32 可用于排查精度回归问题。
+        
+        Returns:
+            精度字符串
+        """
+        import torch
+        
+        if not torch.cuda.is_available():
+            return "fp32"
+        
+        precision = os.getenv("ASR_PRECISION", "").lower().strip()
+        if precision in {"bf16", "fp16", "fp32"}:
+            if precision == "bf16" and not torch.cuda.is_bf16_supported():
+                logger.warning("当前 GPU 不支持 BF16, 回退到 FP16")
+                return "fp16"
+            return precision
+        
+        if precision:
+            logger.warning(f"未知的推理精度 '{precision}', 使用默认配置")
+        
+        if not self.use_fp16:
+            return "fp32"
+        
+        return "bf16" if torch.cuda.is_bf16_supported() else "fp16"
+    
+    def _configure_cuda_backends(self, torch: Any) -> None:
+        """
+        按推理精度配置 CUDA 后端
+        
+        - 半精度模式下允许 autocast 之外的 FP32 矩阵乘法 (如特征提取) 使用 TF32;
+          fp32 模式保持严格精度, 便于排查精度问题
+        - CUDNN_BENCHMARK=true 时启用 cuDNN 算法自动选择。输入长度变化时会对每个
+          新形状重新测速, 因此默认关闭, 适合音频长度较为固定的场景
+        
+        Args:
+            torch: 已导入的 torch 模块
+        """
+        if self.precision in {"bf16", "fp16"}:
+            torch.set_float32_matmul_precision("high")
+        
+        if os.getenv("CUDNN_BENCHMARK", "false").lower() == "true":
+            torch.backends.cudnn.benchmark = True
+            logger.info("已启用 cuDNN benchmark")
+    
+    def _warmup(self, model: Any) -> None:
+        """
+        用 warmup_seconds 秒静音执行一次推理预热
+        
+        首次推理时的 CUDA 内核加载、cuDNN 初始化、JIT 编译等一次性开销
+        在加载阶段完成, 不计入第一个用户请求的延迟; 预热音频足够长时,
+        缓存分配器也在此时扩展到稳态大小。预热失败不影响加载结果
+        
+        Args:
+            model: 已加载的模型
+        """
+        import numpy as np
+        
+        start_time = time.time()
+        try:
+            with self.inference_context():
+                model.transcribe(
+                    [np.zeros(max(1, int(16000 * self.warmup_seconds)), dtype=np.float32)],
+                    batch_size=1,
+                    source_lang="en",
+                    target_lang="en",
+                    timestamps=False,
+                )
+            logger.info(f"模型预热完成, 耗时: {time.time() - start_time:.2f}秒")
+        except Exception as e:
+            logger.warning(f"模型预热失败: {e}")
+    
+    @contextmanager
+    def inference_context(self):
+        """
+        推理上下文: 关闭 autograd 记录, 并按推理精度启用 autocast
+        """
+        import torch
+        
+        dtype = {"bf16": torch.bfloat16, "fp16": torch.float16}.get(self.precision)
+        
+        with torch.inference_mode(), torch.autocast(
+            device_type="cuda",
+            dtype=dtype or torch.float16,
+            enabled=dtype is not None,
+        ):
+            yield
+    
     def _load_model(self) -> Any:
         """
         加载 ASR 模型到 GPU
@@ -147,12 +421,18 @@ class ModelManager:
         start_time = time.time()
         
         try:
-            # 延迟导入 NeMo, 避免启动时占用资源
+            # 延迟导入 torch 和 NeMo, 避免启动时占用资源
+            import torch
             from nemo.collections.asr.models import ASRModel
             
+            _configure_cpu_threads(torch)
+            
             # 确定模型源
             model_source = self._get_model_source()
             
+            # 权重直接反序列化到目标设备, 省去先在 CPU 上构建完整权重再整体拷贝到 GPU 的过程
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            
             # 设置模型缓存目录
             os.environ["NEMO_CACHE_DIR"] = self.model_path
             
@@ -160,28 +440,31 @@ class ModelManager:
             if model_source.endswith(".nemo"):
                 # 从本地 .nemo 文件加载
                 logger.info(f"从本地文件加载模型: {model_source}")
-                model = ASRModel.restore_from(model_source)
+                model = ASRModel.restore_from(model_source, map_location=device)
             else:
                 # 从 HuggingFace 下载并加载
                 logger.info(f"从 HuggingFace 下载模型: {model_source}")
-                model = ASRModel.from_pretrained(model_name=model_source)
                 
-                # 保存模型到本地供后续使用
-                if self.nemo_filename:
-                    save_filename = self.nemo_filename
-                else:
-                    # 如果没有指定文件名，从模型名生成
-                    save_filename = self.model_name.split("/")[-1] + ".nemo"
+                save_path = self._expected_nemo_path()
+                save_filename = os.path.basename(save_path)
                 
-                save_path = os.path.join(self.model_path, save_filename)
-                os.makedirs(self.model_path, exist_ok=True)
-                try:
-                    model.save_to(save_path)
-                    logger.info(f"模型已保存到本地: {save_path}")
-                except Exception as e:
-                    logger.warning(f"保存模型到本地失败: {e}")
+                # 直接将仓库中的 .nemo 文件下载到本地目录, 之后从该文件加载,
+                # 避免 from_pretrained 之后再用 save_to 重新打包写一遍全部权重
+                local_file = self._download_nemo_file(model_source, save_filename)
+                if local_file is not None:
+                    model = ASRModel.restore_from(local_file, map_location=device)
+                else:
+                    model = ASRModel.from_pretrained(model_name=model_source, map_location=device)
+                    
+                    # 保存模型到本地供后续使用
+                    os.makedirs(self.model_path, exist_ok=True)
+                    try:
+                        model.save_to(save_path)
+                        logger.info(f"模型已保存到本地: {save_path}")
+                    except Exception as e:
+                        logger.warning(f"保存模型到本地失败: {e}")
             
-            # 移动模型到 GPU (如果可用)
+            # 确保模型位于 GPU (如果可用), 权重已在目标设备上时不会产生拷贝
             if torch.cuda.is_available():
                 model = model.cuda()
                 logger.info(f"模型已移动到 GPU: {torch.cuda.get_device_name(0)}")
@@ -191,11 +474,31 @@ class ModelManager:
             # 设置为评估模式
             model.eval()
             
-            # 使用 FP16 半精度 (减少显存占用)
-            if self.use_fp16 and torch.cuda.is_available():
+            # 使用半精度 (减少显存占用, 提升吞吐)
+            self.precision = self._resolve_precision()
+            if self.precision == "bf16":
+                model = model.to(dtype=torch.bfloat16)
+                logger.info("已启用 BF16 半精度推理")
+            elif self.precision == "fp16":
                 model = model.half()
                 logger.info("已启用 FP16 半精度推理")
             
+            # 转换逐个参数替换, 旧的 FP32 显存块由缓存分配器保留;
+            # 归还给驱动, 使其他模型可用且显存预算判断 (mem_get_info) 准确
+            if self.precision in {"bf16", "fp16"} and torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            
+            if torch.cuda.is_available():
+                self._configure_cuda_backends(torch)
+            
+            self._model_bytes = sum(
+                t.numel() * t.element_size()
+                for t in list(model.parameters()) + list(model.buffers())
+            )
+            
+            if os.getenv("MODEL_WARMUP", "true").lower() == "true":
+                self._warmup(model)
+            
             elapsed = time.time() - start_time
             logger.info(f"模型加载完成, 耗时: {elapsed:.2f}秒")
             
@@ -205,88 +508,209 @@ class ModelManager:
             logger.error(f"模型加载失败: {e}")
             raise
     
-    def _unload_model(self) -> None:
+    def _unload_model(self, offload: bool = True) -> None:
         """
         卸载模型并释放显存
         
-        注意: 只有在没有请求使用模型时才能卸载
+        注意: 只有在没有请求使用模型时才能卸载, 调用方需持有 self._lock
+        
+        Args:
+            offload: 启用 MODEL_OFFLOAD_CPU 时是否将权重暂存到锁页内存
         """
-        with self._lock:
-            if self._model is None:
-                return
+        if self._model is None:
+            return
+        
+        if self._usage_count > 0:
+            logger.warning(f"有 {self._usage_count} 个请求正在使用模型, 跳过卸载")
+            return
+        
+        logger.info("开始卸载模型并释放显存...")
+        
+        self._cancel_idle_timer()
+        
+        try:
+            import torch
             
-            if self._usage_count > 0:
-                logger.warning(f"有 {self._usage_count} 个请求正在使用模型, 跳过卸载")
-                return
+            if offload and torch.cuda.is_available():
+                if self.offload_to_cpu:
+                    self._offload_model(self._model)
+                elif self.keep_skeleton and self._find_local_nemo() is not None:
+                    self._keep_model_skeleton(self._model)
             
-            logger.info("开始卸载模型并释放显存...")
+            # 删除模型引用
+            del self._model
+            self._model = None
             
-            try:
-                # 删除模型引用
-                del self._model
-                self._model = None
-                
-                # 清理 GPU 缓存
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-                    torch.cuda.synchronize()
-                
-                logger.info("模型已卸载, 显存已释放")
-                
-            except Exception as e:
-                logger.error(f"卸载模型时出错: {e}")
+            # 清理 GPU 缓存 (缓存分配器按流跟踪待完成的释放, 无需全设备同步)
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            
+            logger.info("模型已卸载, 显存已释放")
+        
+        except Exception as e:
+            logger.error(f"卸载模型时出错: {e}")
     
-    def _monitor_timeout(self) -> None:
+    def _offload_model(self, model: Any) -> None:
         """
-        后台监控线程: 检查模型是否超时未使用
+        将模型权重暂存到锁页内存, 并释放模型占用的显存
+        
+        模型对象本身保留 (参数移动到 meta 设备), 下次加载时由
+        _restore_offloaded_model 恢复。锁页缓冲区只在首次卸载时分配, 之后复用。
         
-        运行逻辑:
-        1. 每隔一定时间检查一次
-        2. 如果超过 timeout_sec 未使用且无正在处理的请求, 则卸载模型
+        Args:
+            model: 已加载到 GPU 的模型
         """
-        check_interval = min(30, self.timeout_sec // 2)  # 检查间隔
+        import torch
         
-        logger.info(f"超时监控线程已启动, 检查间隔: {check_interval}秒")
+        tensors = _model_tensors(model)
+        if self._cpu_weights is None:
+            self._cpu_weights = {
+                name: torch.empty_like(t, device="cpu", pin_memory=True)
+                for name, t in tensors.items()
+            }
         
-        while not self._monitor_stop_event.is_set():
-            # 等待一段时间
-            self._monitor_stop_event.wait(check_interval)
-            
-            if self._monitor_stop_event.is_set():
-                break
-            
-            # 检查是否需要卸载
-            with self._lock:
-                if self._model is None:
-                    continue
-                
-                if self._usage_count > 0:
-                    continue
-                
-                elapsed = time.time() - self._last_used_time
-                if elapsed >= self.timeout_sec:
-                    logger.info(f"模型闲置超过 {self.timeout_sec}秒, 准备卸载...")
-                    self._unload_model()
-        
-        logger.info("超时监控线程已停止")
-    
-    def _start_monitor(self) -> None:
-        """启动超时监控线程"""
-        if self._monitor_thread is None or not self._monitor_thread.is_alive():
-            self._monitor_stop_event.clear()
-            self._monitor_thread = threading.Thread(
-                target=self._monitor_timeout,
-                daemon=True,
-                name="ModelTimeoutMonitor"
+        with torch.no_grad():
+            for name, t in tensors.items():
+                self._cpu_weights[name].copy_(t, non_blocking=True)
+        # 拷贝完成前不能释放显存
+        torch.cuda.synchronize()
+        
+        model.to("meta")
+        self._offloaded_model = model
+        logger.info("模型权重已暂存到锁页内存")
+    
+    def _keep_model_skeleton(self, model: Any) -> None:
+        """
+        释放模型显存, 但保留模型对象 (模块结构、分词器、解码器配置等)
+        
+        下次加载时只需从 .nemo 文件读取权重, 跳过解包配置、构建模块和初始化分词器。
+        不在 state_dict 中的缓冲区 (如特征提取的窗函数) 无法从文件恢复, 单独保存到 CPU。
+        
+        Args:
+            model: 已加载到 GPU 的模型
+        """
+        persistent = set(model.state_dict().keys())
+        self._skeleton_buffers = {
+            name: buffer.detach().to("cpu")
+            for name, buffer in model.named_buffers()
+            if name not in persistent
+        }
+        
+        model.to("meta")
+        self._offloaded_model = model
+        logger.info("模型显存已释放, 保留模型结构用于快速重新加载")
+    
+    def _restore_offloaded_model(self) -> Any:
+        """
+        恢复之前卸载时保留的模型对象
+        
+        有锁页内存权重时在专用 CUDA 流上异步拷贝; 否则只从 .nemo 文件读取权重,
+        两种方式都不需要重新反序列化和构建整个模型
+        
+        Returns:
+            恢复到 GPU 的模型实例
+        """
+        import torch
+        
+        start_time = time.time()
+        model = self._offloaded_model
+        # 恢复失败时由调用方回退为完整加载
+        self._offloaded_model = None
+        
+        model.to_empty(device="cuda")
+        
+        if self._cpu_weights is not None:
+            stream = torch.cuda.Stream()
+            with torch.no_grad(), torch.cuda.stream(stream):
+                for name, t in _model_tensors(model).items():
+                    t.copy_(self._cpu_weights[name], non_blocking=True)
+            stream.synchronize()
+            logger.info(f"已从锁页内存恢复模型, 耗时: {time.time() - start_time:.2f}秒")
+            return model
+        
+        nemo_path = self._find_local_nemo()
+        if nemo_path is None:
+            raise RuntimeError("本地 .nemo 文件不存在, 无法恢复模型权重")
+        
+        # load_state_dict 拷贝时会转换为参数当前的半精度类型
+        model.load_state_dict(_read_nemo_weights(nemo_path))
+        with torch.no_grad():
+            buffers = dict(model.named_buffers())
+            for name, value in self._skeleton_buffers.items():
+                buffers[name].copy_(value)
+        self._skeleton_buffers = None
+        
+        logger.info(f"已从 {nemo_path} 重新加载权重, 耗时: {time.time() - start_time:.2f}秒")
+        return model
+    
+    def bind_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        绑定用于调度闲置卸载定时器的事件循环
+        
+        未绑定时退回到 threading.Timer
+        
+        Args:
+            loop: 服务运行所在的事件循环
+        """
+        self._loop = loop
+    
+    def _schedule_idle_unload(self) -> None:
+        """
+        模型变为空闲时安排超时卸载 (调用方需持有 self._lock)
+        
+        每次使用计数变化都会递增代数, 已安排的定时器触发时代数不一致则直接忽略,
+        因此不需要跨线程取消定时器
+        """
+        self._idle_generation += 1
+        generation = self._idle_generation
+        
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._arm_idle_timer, generation)
+        else:
+            # 未绑定事件循环时只保留一个定时器线程, 重新安排前取消旧的
+            self._cancel_idle_timer()
+            self._idle_timer = threading.Timer(
+                self.timeout_sec, self._on_idle_timeout, args=(generation,)
             )
-            self._monitor_thread.start()
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+    
+    def _cancel_idle_timer(self) -> None:
+        """取消 threading.Timer 闲置定时器 (调用方需持有 self._lock)"""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
     
-    def _stop_monitor(self) -> None:
-        """停止超时监控线程"""
-        if self._monitor_thread is not None:
-            self._monitor_stop_event.set()
-            self._monitor_thread.join(timeout=5)
-            self._monitor_thread = None
+    def _arm_idle_timer(self, generation: int) -> None:
+        """在事件循环线程中设置超时定时器, 替换之前的定时器"""
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        
+        # 卸载涉及显存释放等阻塞操作, 到期后放到线程池中执行
+        self._idle_handle = self._loop.call_later(
+            self.timeout_sec,
+            self._loop.run_in_executor,
+            None,
+            self._on_idle_timeout,
+            generation,
+        )
+    
+    def _on_idle_timeout(self, generation: int) -> None:
+        """
+        超时定时器到期: 若期间模型未被再次使用, 则卸载模型
+        
+        Args:
+            generation: 安排定时器时的空闲代数
+        """
+        with self._lock:
+            if generation != self._idle_generation:
+                return
+            if self._model is None or self._usage_count > 0:
+                return
+            
+            logger.info(f"模型闲置超过 {self.timeout_sec}秒, 准备卸载...")
+            self._unload_model()
     
     def ensure_model_loaded(self) -> Any:
         """
@@ -295,20 +719,71 @@ class ModelManager:
         Returns:
             加载好的模型实例
         """
-        with self._lock:
-            if self._model is None:
-                if self._is_loading:
-                    # 其他线程正在加载, 等待
-                    logger.debug("等待其他线程完成模型加载...")
-                else:
-                    self._is_loading = True
+        model = self._model
+        if model is not None:
+            return model
+        
+        # 其他线程正在加载时在此等待, 加载完成后直接返回已加载的模型
+        with self._load_lock:
+            with self._lock:
+                if self._model is not None:
+                    return self._model
+                self._is_loading = True
+            
+            try:
+                model = None
+                if self._offloaded_model is not None:
                     try:
-                        self._model = self._load_model()
-                        self._start_monitor()
-                    finally:
-                        self._is_loading = False
+                        model = self._restore_offloaded_model()
+                    except Exception as e:
+                        logger.warning(f"恢复保留的模型失败, 改为完整加载: {e}")
+                        self._skeleton_buffers = None
+                if model is None:
+                    model = self._load_model()
+            finally:
+                with self._lock:
+                    self._is_loading = False
+            
+            with self._lock:
+                self._model = model
+                self._last_used_time = time.monotonic()
+                # 加载后若一直无人使用, 同样在超时后卸载
+                if self._usage_count == 0:
+                    self._schedule_idle_unload()
             
-            return self._model
+            return model
+    
+    def _load(self) -> Any:
+        """
+        加载模型; 由多模型管理器持有时经其加载, 保证不超出模型数量和显存预算
+        
+        Returns:
+            加载好的模型实例
+        """
+        loader = self._loader
+        if loader is not None:
+            return loader(self)
+        return self.ensure_model_loaded()
+    
+    async def aensure_model_loaded(self) -> Any:
+        """
+        确保模型已加载 (异步版本)
+        
+        加载在工作线程中执行, 不阻塞事件循环; 并发调用方在 asyncio.Lock 上等待,
+        而不是各自占用一个线程阻塞在加载锁上
+        
+        Returns:
+            加载好的模型实例
+        """
+        model = self._model
+        if model is not None:
+            return model
+        
+        if self._aio_lock is None:
+            self._aio_lock = asyncio.Lock()
+        
+        async with self._aio_lock:
+            return await asyncio.to_thread(self._load)
     
     @contextmanager
     def get_model(self):
@@ -318,6 +793,7 @@ class ModelManager:
         使用上下文管理器确保:
         1. 模型在使用时不会被卸载
         2. 正确更新使用计数和时间戳
+        3. 推理在 inference_mode 和对应精度的 autocast 下执行
         
         使用示例:
             with manager.get_model() as model:
@@ -326,23 +802,32 @@ class ModelManager:
         Yields:
             ASR 模型实例
         """
-        model = None
-        try:
-            with self._lock:
-                # 确保模型已加载
-                model = self.ensure_model_loaded()
-                
-                # 增加使用计数
-                self._usage_count += 1
-                self._last_used_time = time.time()
+        while True:
+            # 确保模型已加载 (加载期间不持有状态锁)
+            model = self._load()
             
-            yield model
+            with self._lock:
+                # 加载完成到加锁之间模型可能已被卸载, 此时重新加载
+                if self._model is model:
+                    # 增加使用计数, 并使已安排的闲置卸载失效
+                    self._usage_count += 1
+                    self._idle_generation += 1
+                    break
+        
+        # 时间戳只用于闲置判断和状态展示, 单次赋值无需加锁
+        self._last_used_time = time.monotonic()
+        
+        try:
+            with self.inference_context():
+                yield model
             
         finally:
+            self._last_used_time = time.monotonic()
             with self._lock:
-                # 减少使用计数
+                # 减少使用计数, 归零时安排闲置卸载
                 self._usage_count = max(0, self._usage_count - 1)
-                self._last_used_time = time.time()
+                if self._usage_count == 0:
+                    self._schedule_idle_unload()
     
     def get_status(self) -> dict:
         """
@@ -351,12 +836,15 @@ class ModelManager:
         Returns:
             包含模型状态信息的字典
         """
+        import torch
+        
         with self._lock:
             is_loaded = self._model is not None
-            idle_time = time.time() - self._last_used_time if self._last_used_time > 0 else 0
+            idle_time = time.monotonic() - self._last_used_time if self._last_used_time > 0 else 0
             
             status = {
                 "model_loaded": is_loaded,
+                "offloaded_to_cpu": self._offloaded_model is not None and self._cpu_weights is not None,
                 "model_name": self.model_name,
                 "model_path": self.model_path,
                 "usage_count": self._usage_count,
@@ -365,17 +853,12 @@ class ModelManager:
                 "use_fp16": self.use_fp16,
                 "gpu_available": torch.cuda.is_available(),
             }
-            
-            if torch.cuda.is_available():
-                status["gpu_name"] = torch.cuda.get_device_name(0)
-                status["gpu_memory_allocated_mb"] = round(
-                    torch.cuda.memory_allocated(0) / 1024 / 1024, 2
-                )
-                status["gpu_memory_reserved_mb"] = round(
-                    torch.cuda.memory_reserved(0) / 1024 / 1024, 2
-                )
-            
-            return status
+        
+        # 显存查询不需要持有状态锁
+        if torch.cuda.is_available():
+            status.update(_query_gpu_memory(torch))
+        
+        return status
     
     def force_unload(self) -> bool:
         """
@@ -400,7 +883,21 @@ class ModelManager:
             是否成功加载
         """
         try:
-            self.ensure_model_loaded()
+            self._load()
+            return True
+        except Exception as e:
+            logger.error(f"强制加载模型失败: {e}")
+            return False
+    
+    async def aforce_load(self) -> bool:
+        """
+        强制预加载模型 (异步版本, 不阻塞事件循环)
+        
+        Returns:
+            是否成功加载
+        """
+        try:
+            await self.aensure_model_loaded()
             return True
         except Exception as e:
             logger.error(f"强制加载模型失败: {e}")
@@ -412,17 +909,126 @@ class ModelManager:
         """
         logger.info("正在关闭模型管理器...")
         
-        # 停止监控线程
-        self._stop_monitor()
-        
-        # 卸载模型
+        # 卸载模型, 并使已安排的闲置卸载失效
         with self._lock:
+            self._idle_generation += 1
             if self._model is not None:
-                self._unload_model()
+                self._unload_model(offload=False)
+            self._offloaded_model = None
+            self._cpu_weights = None
+            self._skeleton_buffers = None
         
         logger.info("模型管理器已关闭")
 
 
+def _configure_cpu_threads(torch: Any) -> None:
+    """
+    设置 torch CPU 线程数
+    
+    TORCH_NUM_THREADS 未设置 (或为 0) 时: GPU 推理只设为 1 个线程, 推理本身在 GPU 上执行,
+    避免 torch 的 OpenMP 线程与音频解码线程池争抢 CPU; CPU 推理保持 torch 默认值
+    
+    Args:
+        torch: 已导入的 torch 模块
+    """
+    num_threads = int(os.getenv("TORCH_NUM_THREADS", "0"))
+    if num_threads <= 0:
+        if not torch.cuda.is_available():
+            return
+        num_threads = 1
+    
+    if torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+        logger.info(f"torch CPU 线程数: {num_threads}")
+    
+    try:
+        torch.set_num_interop_threads(num_threads)
+    except RuntimeError:
+        # 已有并行任务执行后不能再修改, 只在首次加载时生效
+        pass
+
+
+def _model_tensors(model: Any) -> dict:
+    """
+    模型的全部参数和缓冲区
+    
+    与 state_dict 不同, 包含非持久化缓冲区, 模型移动到 meta 设备后这些张量同样需要恢复
+    
+    Args:
+        model: 模型实例
+    
+    Returns:
+        {名称: 张量} 字典
+    """
+    tensors = dict(model.named_parameters())
+    tensors.update(model.named_buffers())
+    return tensors
+
+
+def _read_nemo_weights(nemo_path: str) -> dict:
+    """
+    只从 .nemo 归档中读取权重, 不解包配置、不构建模型
+    
+    Args:
+        nemo_path: .nemo 文件路径
+    
+    Returns:
+        CPU 上的 state_dict
+    """
+    import tarfile
+    import torch
+    
+    with tarfile.open(nemo_path, "r:*") as tar:
+        member = next(
+            (m for m in tar.getmembers() if os.path.basename(m.name) == "model_weights.ckpt"),
+            None,
+        )
+        if member is None:
+            raise RuntimeError(f"{nemo_path} 中未找到 model_weights.ckpt")
+        
+        with tar.extractfile(member) as f:
+            return torch.load(f, map_location="cpu", weights_only=True)
+
+
+# 显存统计缓存: (查询时间, 统计结果), 状态接口被频繁轮询时复用
+_GPU_STATS_TTL_SEC = 1.0
+_gpu_stats_cache: Optional[Tuple[float, dict]] = None
+
+
+def _query_gpu_memory(torch: Any) -> dict:
+    """
+    查询 GPU 名称和显存使用情况
+    
+    memory_allocated 和 memory_reserved 内部各调用一次 memory_stats,
+    这里只调用一次并从结果中读取两项; 结果缓存 1 秒
+    
+    Args:
+        torch: 已导入的 torch 模块
+    
+    Returns:
+        包含 gpu_name 和显存占用 (MB) 的字典
+    """
+    global _gpu_stats_cache
+    
+    now = time.monotonic()
+    cached = _gpu_stats_cache
+    if cached is not None and now - cached[0] < _GPU_STATS_TTL_SEC:
+        return cached[1]
+    
+    stats = torch.cuda.memory_stats(0)
+    result = {
+        "gpu_name": torch.cuda.get_device_name(0),
+        "gpu_memory_allocated_mb": round(
+            stats.get("allocated_bytes.all.current", 0) / 1024 / 1024, 2
+        ),
+        "gpu_memory_reserved_mb": round(
+            stats.get("reserved_bytes.all.current", 0) / 1024 / 1024, 2
+        ),
+    }
+    _gpu_stats_cache = (now, result)
+    return result
+
+
 # 全局单例实例
 _model_manager: Optional[ModelManager] = None
 _instance_lock = threading.Lock()
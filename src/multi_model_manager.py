@@ -6,13 +6,14 @@
 """
 
 import os
+import sys
 import time
 import threading
-from typing import Dict, Optional, Any, List
-from pathlib import Path
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, Optional, List
 from contextlib import contextmanager
 
-import torch
 from loguru import logger
 
 from .model_manager import ModelManager
@@ -27,6 +28,9 @@ class MultiModelManager:
     - 每个模型独立的超时管理
     - 线程安全的多模型访问
     
+    多个模型可同时驻留显存, 加载新模型前若显存不足(或超出 MAX_LOADED_MODELS),
+    按最近最少使用 (LRU) 顺序卸载空闲模型, 避免在模型间切换时反复从磁盘重新加载
+    
     支持的模型：
     - nvidia/canary-1b-v2
     - nvidia/parakeet-tdt-0.6b-v3
@@ -46,6 +50,21 @@ class MultiModelManager:
         }
     }
     
+    # 常见别名
+    MODEL_ALIASES = {
+        "canary": "canary-1b-v2",
+        "canary-1b": "canary-1b-v2",
+        "parakeet": "parakeet-tdt-0.6b-v3",
+        "parakeet-tdt": "parakeet-tdt-0.6b-v3",
+    }
+    
+    # 名称查找表: 覆盖模型名称和别名, 以及带 nvidia/ 前缀的形式, 标准化只需一次字典查找
+    _NAME_LUT = {
+        sys.intern(prefix + name): sys.intern(target)
+        for name, target in {**{n: n for n in MODEL_CONFIGS}, **MODEL_ALIASES}.items()
+        for prefix in ("", "nvidia/")
+    }
+    
     def __init__(
         self,
         models_base_path: Optional[str] = None,
@@ -80,10 +99,15 @@ class MultiModelManager:
         self.timeout_sec = timeout_sec or int(os.getenv("MODEL_TIMEOUT_SEC", "300"))
         self.use_fp16 = use_fp16 if use_fp16 is not None else os.getenv("USE_FP16", "true").lower() == "true"
         
+        # 同时驻留显存的最大模型数量, 0 表示只受显存容量限制
+        self.max_loaded_models = int(os.getenv("MAX_LOADED_MODELS", "0"))
+        
         # 模型管理器字典：{model_name: ModelManager}
-        self._managers: Dict[str, ModelManager] = {}
+        # 初始化后为只读视图, 请求路径无锁读取; shutdown 时整体替换为空视图
+        self._managers: Mapping[str, ModelManager] = MappingProxyType({})
+        self._available_models = ""
         
-        # 全局锁
+        # 模型加载锁, 串行化显存预算判断和加载
         self._lock = threading.RLock()
         
         # 初始化启用的模型管理器
@@ -97,6 +121,7 @@ class MultiModelManager:
     
     def _initialize_managers(self):
         """初始化各个模型的管理器"""
+        managers: Dict[str, ModelManager] = {}
         for model_name in self.enabled_models:
             if model_name not in self.MODEL_CONFIGS:
                 logger.warning(f"未知的模型名称: {model_name}, 跳过")
@@ -111,9 +136,70 @@ class MultiModelManager:
                 timeout_sec=self.timeout_sec,
                 use_fp16=self.use_fp16
             )
+            # 单个模型被卸载后重新加载时, 同样先经过 LRU 卸载
+            manager._loader = self._ensure_loaded
             
-            self._managers[model_name] = manager
+            managers[model_name] = manager
             logger.info(f"已初始化模型管理器: {model_name} -> {config['description']}")
+        
+        self._managers = MappingProxyType(managers)
+        self._available_models = ", ".join(managers)
+        
+        prefetch = os.getenv("PREFETCH_WEIGHTS", "false").lower() == "true"
+        eager_load = os.getenv("EAGER_LOAD", "false").lower() == "true"
+        if prefetch or eager_load:
+            threading.Thread(
+                target=self._background_start,
+                args=(prefetch, eager_load),
+                daemon=True,
+                name="ModelWarmStart"
+            ).start()
+    
+    def _background_start(self, prefetch: bool, eager_load: bool) -> None:
+        """
+        后台启动任务: 预读模型文件, 然后依次加载所有启用的模型
+        
+        模型逐个加载, 避免同时加载造成显存峰值。加载期间到达的请求
+        会等待同一次加载完成, 不会重复加载
+        
+        Args:
+            prefetch: 是否预读模型文件到页缓存
+            eager_load: 是否在启动时加载所有模型
+        """
+        if prefetch:
+            self._prefetch_weights()
+        
+        if not eager_load:
+            return
+        
+        for model_name in list(self._managers):
+            try:
+                self.ensure_model_loaded(model_name)
+            except Exception as e:
+                logger.error(f"启动时加载模型 {model_name} 失败: {e}")
+    
+    def _prefetch_weights(self) -> None:
+        """
+        并行预读各模型的 .nemo 文件到系统页缓存
+        
+        首次加载模型时 restore_from 顺序读取整个归档, 冷磁盘上耗时较长;
+        启动时在后台提前读入, 加载时直接命中页缓存。只读取不保留数据, 不占用进程内存
+        """
+        paths = [
+            path for path in (m.get_local_nemo_path() for m in self._managers.values())
+            if path is not None
+        ]
+        if not paths:
+            return
+        
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="prefetch") as executor:
+            total = sum(executor.map(_read_into_page_cache, paths))
+        
+        logger.info(
+            f"模型文件预读完成: {len(paths)} 个文件, "
+            f"{total / 1024 / 1024:.0f}MB, 耗时: {time.time() - start_time:.2f}秒"
+        )
     
     def get_model_manager(self, model_name: str) -> Optional[ModelManager]:
         """
@@ -128,14 +214,13 @@ class MultiModelManager:
         # 标准化模型名称
         model_name = self._normalize_model_name(model_name)
         
-        if model_name not in self._managers:
+        manager = self._managers.get(model_name)
+        if manager is None:
             logger.warning(
-                f"模型 {model_name} 未启用。"
-                f"可用模型: {', '.join(self._managers.keys())}"
+                "模型 {} 未启用。可用模型: {}", model_name, self._available_models
             )
-            return None
         
-        return self._managers[model_name]
+        return manager
     
     def _normalize_model_name(self, model_name: str) -> str:
         """
@@ -146,19 +231,15 @@ class MultiModelManager:
         - "nvidia/canary-1b-v2" -> "canary-1b-v2"
         - "canary-1b" -> "canary-1b-v2"
         """
-        # 移除 nvidia/ 前缀
+        normalized = self._NAME_LUT.get(model_name)
+        if normalized is not None:
+            return normalized
+        
+        # 未知名称: 仅移除 nvidia/ 前缀
         if model_name.startswith("nvidia/"):
             model_name = model_name[7:]
         
-        # 标准化常见别名
-        alias_map = {
-            "canary": "canary-1b-v2",
-            "canary-1b": "canary-1b-v2",
-            "parakeet": "parakeet-tdt-0.6b-v3",
-            "parakeet-tdt": "parakeet-tdt-0.6b-v3",
-        }
-        
-        return alias_map.get(model_name, model_name)
+        return model_name
     
     @contextmanager
     def get_model(self, model_name: str):
@@ -179,12 +260,80 @@ class MultiModelManager:
         if manager is None:
             raise ValueError(
                 f"模型 {model_name} 不可用。"
-                f"可用模型: {', '.join(self._managers.keys())}"
+                f"可用模型: {self._available_models}"
             )
         
+        self._ensure_loaded(manager)
+        
         with manager.get_model() as model:
             yield model
     
+    def ensure_model_loaded(self, model_name: str) -> None:
+        """
+        确保指定模型已加载 (阻塞调用), 可用于在解码音频的同时提前加载模型
+        
+        Args:
+            model_name: 模型名称
+        """
+        manager = self.get_model_manager(model_name)
+        if manager is not None:
+            self._ensure_loaded(manager)
+    
+    def _ensure_loaded(self, manager: ModelManager) -> Any:
+        """
+        加载模型, 必要时先按 LRU 卸载其他空闲模型
+        
+        Returns:
+            加载好的模型实例
+        """
+        if not manager.is_loaded:
+            # 加载操作串行执行, 保证显存预算判断和加载之间不被其他加载插入
+            with self._lock:
+                if not manager.is_loaded:
+                    self._evict_for(manager)
+                return manager.ensure_model_loaded()
+        return manager.ensure_model_loaded()
+    
+    def _evict_for(self, manager: ModelManager) -> None:
+        """
+        为即将加载的模型腾出显存
+        
+        按最后使用时间从旧到新卸载空闲模型, 直到剩余显存足以容纳新模型
+        且已加载模型数量低于 max_loaded_models。正在处理请求的模型不会被卸载。
+        
+        Args:
+            manager: 即将加载模型的管理器
+        """
+        import torch
+        
+        if not torch.cuda.is_available():
+            return
+        
+        required = manager.estimate_model_bytes()
+        
+        candidates = sorted(
+            (m for m in self._managers.values() if m is not manager and m.is_loaded),
+            key=lambda m: m.last_used_time,
+        )
+        loaded_count = len(candidates)
+        
+        for candidate in candidates:
+            over_count = self.max_loaded_models > 0 and loaded_count >= self.max_loaded_models
+            free_bytes, _ = torch.cuda.mem_get_info()
+            if not over_count and free_bytes >= required:
+                return
+            
+            if not candidate.is_idle:
+                continue
+            
+            logger.info(
+                f"显存预算不足, 卸载最久未使用的模型: {candidate.model_name} "
+                f"(剩余显存: {free_bytes / 1024 / 1024:.0f}MB, "
+                f"需要: {required / 1024 / 1024:.0f}MB)"
+            )
+            if candidate.force_unload():
+                loaded_count -= 1
+    
     def load_model(self, model_name: str) -> bool:
         """
         预加载指定模型
@@ -199,7 +348,7 @@ class MultiModelManager:
         if manager is None:
             return False
         
-        return manager.load_model()
+        return manager.force_load()
     
     def unload_model(self, model_name: str) -> bool:
         """
@@ -226,6 +375,16 @@ class MultiModelManager:
         """
         return list(self._managers.keys())
     
+    def bind_event_loop(self, loop) -> None:
+        """
+        为所有模型管理器绑定事件循环, 用于调度闲置卸载定时器
+        
+        Args:
+            loop: 服务运行所在的事件循环
+        """
+        for manager in self._managers.values():
+            manager.bind_event_loop(loop)
+    
     def get_status(self, model_name: Optional[str] = None) -> dict:
         """
         获取模型状态
@@ -260,14 +419,47 @@ class MultiModelManager:
         """关闭所有模型管理器"""
         logger.info("正在关闭多模型管理器...")
         
-        for name, manager in self._managers.items():
+        with self._lock:
+            managers = self._managers
+            self._managers = MappingProxyType({})
+            self._available_models = ""
+        
+        for name, manager in managers.items():
             logger.info(f"关闭模型: {name}")
             manager.shutdown()
         
-        self._managers.clear()
         logger.info("多模型管理器已关闭")
 
 
+def _read_into_page_cache(path: str, chunk_size: int = 8 * 1024 * 1024) -> int:
+    """
+    顺序读取文件, 使其内容进入系统页缓存
+    
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数, 缓冲区复用
+    
+    Returns:
+        读取的字节数, 读取失败时返回 0
+    """
+    total = 0
+    buffer = bytearray(chunk_size)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                # 提示内核按顺序预读, 加大预读窗口
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                total += n
+    except OSError as e:
+        logger.warning(f"预读模型文件失败: {path}: {e}")
+    
+    return total
+
+
 # 全局实例
 _multi_manager: Optional[MultiModelManager] = None
 _manager_lock = threading.Lock()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+锁页内存音频缓冲池模块
+
+为已解码的音频数组提供预分配的锁页 (pinned) 内存缓冲区:
+- 避免每个请求重复调用 cudaHostAlloc
+- 锁页内存可直接 DMA 到 GPU, 提升 H2D 拷贝吞吐
+- 缓冲区按需分配, 用完归还复用
+
+默认关闭, 通过环境变量 USE_PINNED_POOL=true 启用, 建议先压测对比再在生产启用
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional, List, Any
+
+import numpy as np
+from loguru import logger
+
+from .utils import TARGET_SAMPLE_RATE
+
+
+class PinnedAudioPool:
+    """
+    锁页内存音频缓冲池
+
+    每个缓冲区可容纳 max_seconds 秒的 16kHz float32 音频,
+    超出容量或缓冲区耗尽时回退为普通 (可分页) 内存。
+
+    使用示例:
+        pool = get_pinned_audio_pool()
+        with pool.stage(audio_arrays) as inputs:
+            output = model.transcribe(inputs, ...)
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        pool_size: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        """
+        初始化缓冲池
+
+        Args:
+            enabled: 是否启用, 默认从环境变量 USE_PINNED_POOL 读取
+            pool_size: 缓冲区数量, 默认从环境变量 PINNED_POOL_SIZE 读取
+            max_seconds: 单个缓冲区可容纳的音频时长(秒), 默认从环境变量 PINNED_POOL_MAX_SECONDS 读取
+        """
+        self.enabled = (
+            enabled if enabled is not None
+            else os.getenv("USE_PINNED_POOL", "false").lower() == "true"
+        )
+        self.pool_size = pool_size or int(os.getenv("PINNED_POOL_SIZE", "16"))
+        max_seconds = max_seconds or float(os.getenv("PINNED_POOL_MAX_SECONDS", "30"))
+        self.max_samples = int(max_seconds * TARGET_SAMPLE_RATE)
+
+        # 空闲缓冲区, 以及已分配的缓冲区总数
+        self._free: List[Any] = []
+        self._allocated = 0
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            logger.info(
+                f"锁页内存缓冲池已启用 - 缓冲区数量: {self.pool_size}, "
+                f"单个容量: {max_seconds}秒"
+            )
+
+    def acquire(self, n_samples: int) -> Optional[Any]:
+        """
+        获取一个可容纳 n_samples 个采样点的锁页缓冲区
+
+        Args:
+            n_samples: 所需采样点数
+
+        Returns:
+            锁页内存 torch.Tensor, 超出容量或缓冲区耗尽时返回 None
+        """
+        if n_samples > self.max_samples:
+            return None
+
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            if self._allocated >= self.pool_size:
+                return None
+            self._allocated += 1
+
+        import torch
+
+        try:
+            return torch.empty(self.max_samples, dtype=torch.float32, pin_memory=True)
+        except Exception as e:
+            with self._lock:
+                self._allocated -= 1
+            logger.warning(f"分配锁页内存失败: {e}")
+            return None
+
+    def preallocate(self) -> int:
+        """
+        预先分配全部缓冲区, 避免首批请求在推理路径上调用 cudaHostAlloc
+
+        未启用或 GPU 不可用时不做任何操作
+
+        Returns:
+            本次新分配的缓冲区数量
+        """
+        if not self.enabled:
+            return 0
+
+        import torch
+
+        if not torch.cuda.is_available():
+            return 0
+
+        buffers = []
+        while True:
+            with self._lock:
+                if self._allocated >= self.pool_size:
+                    break
+            buffer = self.acquire(self.max_samples)
+            if buffer is None:
+                break
+            buffers.append(buffer)
+
+        for buffer in buffers:
+            self.release(buffer)
+
+        if buffers:
+            logger.info(f"已预分配 {len(buffers)} 个锁页内存缓冲区")
+        return len(buffers)
+
+    def release(self, buffer: Any) -> None:
+        """
+        归还缓冲区
+
+        Args:
+            buffer: acquire 返回的缓冲区
+        """
+        with self._lock:
+            self._free.append(buffer)
+
+    @contextmanager
+    def stage(self, audios: List[np.ndarray]):
+        """
+        将音频数组拷贝到锁页缓冲区, 作为模型输入
+
+        无法放入缓冲区的音频直接包装为普通 CPU 张量 (零拷贝),
+        保证同一批次的输入类型一致。退出上下文时归还所有缓冲区。
+
+        Args:
+            audios: 16kHz 单声道 float32 数组列表
+
+        Yields:
+            torch.Tensor 输入列表, 与 audios 一一对应
+        """
+        import torch
+
+        buffers = []
+        inputs = []
+        try:
+            for audio in audios:
+                buffer = self.acquire(len(audio))
+                if buffer is None:
+                    inputs.append(torch.from_numpy(audio))
+                    continue
+                buffers.append(buffer)
+                view = buffer[:len(audio)]
+                view.copy_(torch.from_numpy(audio))
+                inputs.append(view)
+
+            yield inputs
+
+        finally:
+            for buffer in buffers:
+                self.release(buffer)
+
+
+# 全局单例实例
+_pinned_pool: Optional[PinnedAudioPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pinned_audio_pool() -> PinnedAudioPool:
+    """
+    获取锁页内存缓冲池单例
+
+    Returns:
+        PinnedAudioPool 实例
+    """
+    global _pinned_pool
+
+    if _pinned_pool is None:
+        with _pool_lock:
+            if _pinned_pool is None:
+                _pinned_pool = PinnedAudioPool()
+
+    return _pinned_pool
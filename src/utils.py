@@ -9,14 +9,73 @@
 - 音频文件预处理
 """
 
+import io
 import os
+import struct
 import tempfile
-from typing import List, Dict, Any, Optional
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Union, BinaryIO, Tuple, NamedTuple
 from pathlib import Path
 
+import numpy as np
 from loguru import logger
 
 
+# 模型要求的输入采样率
+TARGET_SAMPLE_RATE = 16000
+
+# 可由 libsndfile 直接解码的格式 (libsndfile >= 1.1 支持 Opus 和 MP3),
+# 其余格式 (m4a, webm, amr 等) 使用 PyAV (libav) 解码; libsndfile 解码失败时同样回退到 PyAV
+SOUNDFILE_FORMATS = frozenset({".wav", ".flac", ".ogg", ".opus", ".mp3"})
+
+# 模型输入: 音频文件路径, 或已解码的 16kHz 单声道 float32 数组
+AudioInput = Union[str, np.ndarray]
+
+
+class SegmentArray(NamedTuple):
+    """分段时间戳的列式存储: 开始/结束时间为 float64 数组, 文本为列表"""
+    starts: np.ndarray
+    ends: np.ndarray
+    texts: List[str]
+
+
+# 分段输入: 模型输出的字典列表, 或已转换的 SegmentArray
+Segments = Union[List[Dict[str, Any]], SegmentArray]
+
+
+def segments_from_nemo(segments: Segments) -> SegmentArray:
+    """
+    将模型输出的分段字典列表一次性转换为 SegmentArray
+    
+    后续格式化直接按列读取, 不再对每个分段重复字典查找
+    
+    Args:
+        segments: 分段列表, 每个分段包含 'start', 'end', 'segment'/'text' 字段;
+            已是 SegmentArray 时原样返回
+        
+    Returns:
+        SegmentArray 实例
+    """
+    if isinstance(segments, SegmentArray):
+        return segments
+    
+    starts = []
+    ends = []
+    texts = []
+    for segment in segments:
+        starts.append(segment.get('start', 0))
+        ends.append(segment.get('end', 0))
+        # Canary 模型返回的是 'segment' 字段, 也兼容 'text' 字段
+        texts.append(segment.get('segment', segment.get('text', '')))
+    
+    return SegmentArray(
+        starts=np.asarray(starts, dtype=np.float64),
+        ends=np.asarray(ends, dtype=np.float64),
+        texts=texts,
+    )
+
+
 def format_timestamp_srt(seconds: float) -> str:
     """
     将秒数转换为 SRT 格式时间戳
@@ -29,15 +88,7 @@ def format_timestamp_srt(seconds: float) -> str:
     Returns:
         SRT 格式的时间字符串, 如 "00:01:23,456"
     """
-    if seconds < 0:
-        seconds = 0
-    
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    milliseconds = int((seconds % 1) * 1000)
-    
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+    return _format_timestamp(seconds, ",")
 
 
 def format_timestamp_vtt(seconds: float) -> str:
@@ -52,18 +103,143 @@ def format_timestamp_vtt(seconds: float) -> str:
     Returns:
         VTT 格式的时间字符串, 如 "00:01:23.456"
     """
-    if seconds < 0:
-        seconds = 0
+    return _format_timestamp(seconds, ".")
+
+
+def _format_timestamp(seconds: float, sep: str) -> str:
+    """按整数毫秒格式化单个时间戳, 与 _format_timestamps_bulk 结果一致"""
+    # 四舍五入到最近的毫秒 (与 np.rint 一致), 避免 1.005 秒因浮点误差显示为 ,004
+    total_ms = max(int(round(seconds * 1000)), 0)
+    hours, rem = divmod(total_ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, milliseconds = divmod(rem, 1000)
+    
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{sep}{milliseconds:03d}"
+
+
+def _format_timestamps_bulk(times: Union[List[float], np.ndarray], sep: str) -> List[str]:
+    """
+    批量格式化时间戳
+    
+    时、分、秒、毫秒的拆分一次性在 NumPy 中完成, Python 层只剩字符串拼接;
+    长音频的词级时间戳可达数千条, 逐条格式化时解释器开销占主导
+    
+    Args:
+        times: 时间秒数列表或数组
+        sep: 秒与毫秒之间的分隔符, SRT 为 ",", VTT 为 "."
+        
+    Returns:
+        与 times 一一对应的时间戳字符串列表
+    """
+    global _numba_timestamp_filler
+    
+    total_ms = np.rint(np.asarray(times, dtype=np.float64) * 1000).astype(np.int64).clip(min=0)
+    
+    # 数量较多且不超过 99 小时 (定宽 12 字符) 时使用 Numba 编译的函数填充字节缓冲区
+    if len(total_ms) >= _NUMBA_MIN_TIMESTAMPS and total_ms.max() < 100 * 3_600_000:
+        fill = _get_numba_timestamp_filler()
+        if fill is not None:
+            out = np.empty(len(total_ms) * _TIMESTAMP_WIDTH, dtype=np.uint8)
+            try:
+                fill(np.ascontiguousarray(total_ms), out, ord(sep))
+            except Exception as e:
+                logger.warning(f"Numba 格式化时间戳失败, 改用 NumPy: {e}")
+                _numba_timestamp_filler = False
+            else:
+                text = out.tobytes().decode("ascii")
+                return [text[i:i + _TIMESTAMP_WIDTH] for i in range(0, len(text), _TIMESTAMP_WIDTH)]
+    
+    hours, rem = np.divmod(total_ms, 3_600_000)
+    minutes, rem = np.divmod(rem, 60_000)
+    secs, milliseconds = np.divmod(rem, 1000)
+    
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+        for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), milliseconds.tolist())
+    ]
+
+
+# 时间戳定宽: "HH:MM:SS,mmm"
+_TIMESTAMP_WIDTH = 12
+
+# 达到该数量才使用 Numba, 数量较少时 JIT 函数调用的开销不划算
+_NUMBA_MIN_TIMESTAMPS = 1024
+
+# Numba 编译后的填充函数; None 表示尚未编译, False 表示 Numba 不可用
+_numba_timestamp_filler: Any = None
+_numba_lock = threading.Lock()
+
+
+def prepare_timestamp_formatter() -> bool:
+    """
+    导入 Numba 并编译时间戳填充函数 (阻塞调用)
     
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    milliseconds = int((seconds % 1) * 1000)
+    编译需要数秒, 应在服务启动时放到后台线程中执行, 不能在事件循环中调用;
+    编译结果缓存到 NUMBA_CACHE_DIR, 其他 worker 进程和重启后直接加载
     
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+    Returns:
+        Numba 路径是否可用
+    """
+    global _numba_timestamp_filler
+    
+    with _numba_lock:
+        if _numba_timestamp_filler is None:
+            try:
+                import numba
+                
+                @numba.njit("void(int64[::1], uint8[::1], int64)", cache=True)
+                def fill_timestamps(total_ms, out, sep):
+                    """将毫秒数逐条写为定宽 ASCII 时间戳"""
+                    for i in range(total_ms.shape[0]):
+                        value = total_ms[i]
+                        hours = value // 3_600_000
+                        rem = value % 3_600_000
+                        minutes = rem // 60_000
+                        rem = rem % 60_000
+                        secs = rem // 1000
+                        ms = rem % 1000
+                        
+                        base = i * 12
+                        out[base] = 48 + hours // 10
+                        out[base + 1] = 48 + hours % 10
+                        out[base + 2] = 58
+                        out[base + 3] = 48 + minutes // 10
+                        out[base + 4] = 48 + minutes % 10
+                        out[base + 5] = 58
+                        out[base + 6] = 48 + secs // 10
+                        out[base + 7] = 48 + secs % 10
+                        out[base + 8] = sep
+                        out[base + 9] = 48 + ms // 100
+                        out[base + 10] = 48 + (ms // 10) % 10
+                        out[base + 11] = 48 + ms % 10
+                
+                _numba_timestamp_filler = fill_timestamps
+                logger.info("Numba 时间戳格式化已就绪")
+            except Exception as e:
+                logger.debug(f"Numba 不可用, 使用 NumPy 格式化时间戳: {e}")
+                _numba_timestamp_filler = False
+    
+    return bool(_numba_timestamp_filler)
 
 
-def segments_to_srt(segments: List[Dict[str, Any]]) -> str:
+def _get_numba_timestamp_filler():
+    """
+    获取已编译的时间戳填充函数
+    
+    不触发编译: 尚未由 prepare_timestamp_formatter 编译完成或 Numba 不可用时返回 None,
+    调用方使用 NumPy 路径, 保证请求路径上不会出现数秒的编译停顿
+    """
+    return _numba_timestamp_filler or None
+
+
+def _segment_times(segments: SegmentArray, sep: str) -> Tuple[List[str], List[str]]:
+    """一次性格式化所有分段的开始和结束时间"""
+    n = len(segments.texts)
+    formatted = _format_timestamps_bulk(np.concatenate((segments.starts, segments.ends)), sep)
+    return formatted[:n], formatted[n:]
+
+
+def segments_to_srt(segments: Segments) -> str:
     """
     将分段时间戳数据转换为 SRT 字幕格式
     
@@ -72,7 +248,8 @@ def segments_to_srt(segments: List[Dict[str, Any]]) -> str:
     - 字幕块之间用空行分隔
     
     Args:
-        segments: 分段列表, 每个分段包含 'start', 'end', 'segment'/'text' 字段
+        segments: 分段列表, 每个分段包含 'start', 'end', 'segment'/'text' 字段;
+            也可以是 SegmentArray
         
     Returns:
         SRT 格式的字幕字符串
@@ -85,30 +262,21 @@ def segments_to_srt(segments: List[Dict[str, Any]]) -> str:
         00:00:00,000 --> 00:00:02,500
         你好世界
     """
-    if not segments:
+    segments = segments_from_nemo(segments)
+    if not segments.texts:
         return ""
     
-    srt_lines = []
-    
-    for idx, segment in enumerate(segments, start=1):
-        start_time = segment.get('start', 0)
-        end_time = segment.get('end', 0)
-        # Canary 模型返回的是 'segment' 字段, 也兼容 'text' 字段
-        text = segment.get('segment', segment.get('text', ''))
-        
-        # 格式化时间戳
-        start_str = format_timestamp_srt(start_time)
-        end_str = format_timestamp_srt(end_time)
-        
-        # 构建 SRT 字幕块
-        srt_block = f"{idx}\n{start_str} --> {end_str}\n{text}"
-        srt_lines.append(srt_block)
+    # 批量格式化时间戳
+    starts, ends = _segment_times(segments, ",")
     
-    # 用双换行符连接各字幕块
-    return "\n\n".join(srt_lines)
+    # 构建 SRT 字幕块, 用双换行符连接
+    return "\n\n".join(
+        f"{idx}\n{start_str} --> {end_str}\n{text}"
+        for idx, (start_str, end_str, text) in enumerate(zip(starts, ends, segments.texts), start=1)
+    )
 
 
-def segments_to_vtt(segments: List[Dict[str, Any]]) -> str:
+def segments_to_vtt(segments: Segments) -> str:
     """
     将分段时间戳数据转换为 WebVTT 字幕格式
     
@@ -118,7 +286,8 @@ def segments_to_vtt(segments: List[Dict[str, Any]]) -> str:
     - 可选的序号行
     
     Args:
-        segments: 分段列表, 每个分段包含 'start', 'end', 'segment'/'text' 字段
+        segments: 分段列表, 每个分段包含 'start', 'end', 'segment'/'text' 字段;
+            也可以是 SegmentArray
         
     Returns:
         VTT 格式的字幕字符串
@@ -129,31 +298,24 @@ def segments_to_vtt(segments: List[Dict[str, Any]]) -> str:
         00:00:00.000 --> 00:00:02.500
         你好世界
     """
-    if not segments:
+    segments = segments_from_nemo(segments)
+    if not segments.texts:
         return "WEBVTT\n"
     
-    vtt_lines = ["WEBVTT", ""]  # VTT 头部和空行
+    # 批量格式化时间戳
+    starts, ends = _segment_times(segments, ".")
     
-    for segment in segments:
-        start_time = segment.get('start', 0)
-        end_time = segment.get('end', 0)
-        text = segment.get('segment', segment.get('text', ''))
-        
-        # 格式化时间戳
-        start_str = format_timestamp_vtt(start_time)
-        end_str = format_timestamp_vtt(end_time)
-        
-        # 构建 VTT 字幕块 (不包含序号)
-        vtt_block = f"{start_str} --> {end_str}\n{text}"
-        vtt_lines.append(vtt_block)
-        vtt_lines.append("")  # 空行分隔
-    
-    return "\n".join(vtt_lines)
+    # VTT 头部和空行, 字幕块 (不包含序号) 之间用空行分隔, 与 SRT 一样一次拼接
+    body = "\n\n".join(
+        f"{start_str} --> {end_str}\n{text}"
+        for start_str, end_str, text in zip(starts, ends, segments.texts)
+    )
+    return f"WEBVTT\n\n{body}\n"
 
 
 def build_json_response(
     text: str,
-    segments: Optional[List[Dict[str, Any]]] = None,
+    segments: Optional[Segments] = None,
     language: Optional[str] = None,
     duration: Optional[float] = None
 ) -> Dict[str, Any]:
@@ -182,7 +344,7 @@ def build_json_response(
 
 def build_verbose_json_response(
     text: str,
-    segments: List[Dict[str, Any]],
+    segments: Segments,
     language: Optional[str] = None,
     duration: Optional[float] = None,
     words: Optional[List[Dict[str, Any]]] = None
@@ -194,7 +356,7 @@ def build_verbose_json_response(
     
     Args:
         text: 完整的转录文本
-        segments: 分段时间戳列表
+        segments: 分段时间戳列表或 SegmentArray
         language: 检测到的语言代码
         duration: 音频时长(秒)
         words: 可选的词级时间戳列表
@@ -202,21 +364,17 @@ def build_verbose_json_response(
     Returns:
         符合 OpenAI Whisper API verbose_json 格式的字典
     """
-    # 转换 Canary 格式的 segments 为 OpenAI 格式
-    formatted_segments = []
-    for idx, seg in enumerate(segments):
-        formatted_seg = {
-            "id": idx,
-            "start": seg.get('start', 0),
-            "end": seg.get('end', 0),
-            "text": seg.get('segment', seg.get('text', '')),
-        }
-        formatted_segments.append(formatted_seg)
-    
+    # 转换 Canary 格式的 segments 为 OpenAI 格式 (按列读取, 单次推导式构建)
+    segments = segments_from_nemo(segments)
     response = {
         "task": "transcribe",
         "text": text,
-        "segments": formatted_segments,
+        "segments": [
+            {"id": idx, "start": start, "end": end, "text": seg_text}
+            for idx, (start, end, seg_text) in enumerate(
+                zip(segments.starts.tolist(), segments.ends.tolist(), segments.texts)
+            )
+        ],
     }
     
     if language:
@@ -227,79 +385,127 @@ def build_verbose_json_response(
     
     if words:
         # 转换词级时间戳格式
-        formatted_words = []
-        for w in words:
-            formatted_words.append({
+        response["words"] = [
+            {
                 "word": w.get('word', w.get('segment', '')),
                 "start": w.get('start', 0),
                 "end": w.get('end', 0),
-            })
-        response["words"] = formatted_words
+            }
+            for w in words
+        ]
     
     return response
 
 
-def save_audio_to_temp(audio_bytes: bytes, suffix: str = ".wav") -> str:
+def get_audio_duration(file_path: str) -> Optional[float]:
     """
-    将音频字节数据保存到临时文件
+    获取音频文件时长
+    
+    结果按 (路径, 修改时间, 文件大小) 缓存, 文件被改写后自动失效
     
     Args:
-        audio_bytes: 音频文件的字节内容
-        suffix: 文件后缀名, 默认 ".wav"
+        file_path: 音频文件路径
         
     Returns:
-        临时文件的完整路径
+        音频时长(秒), 失败返回 None
     """
-    # 创建临时文件, 不自动删除
-    fd, temp_path = tempfile.mkstemp(suffix=suffix)
     try:
-        os.write(fd, audio_bytes)
-    finally:
-        os.close(fd)
+        stat = os.stat(file_path)
+    except OSError as e:
+        logger.warning(f"获取音频时长失败: {e}")
+        return None
     
-    logger.debug(f"音频已保存到临时文件: {temp_path}")
-    return temp_path
+    return _get_audio_duration_cached(file_path, stat.st_mtime_ns, stat.st_size)
 
 
-def cleanup_temp_file(file_path: str) -> None:
-    """
-    清理临时文件
+@lru_cache(maxsize=256)
+def _get_audio_duration_cached(file_path: str, mtime_ns: int, size: int) -> Optional[float]:
+    """读取音频时长, mtime_ns 仅作为缓存键"""
+    # WAV 只解析头部, 其他格式 (或头部无法解析) 再交给 librosa
+    try:
+        duration = _read_wav_duration(file_path, size)
+        if duration is not None:
+            return duration
+    except OSError as e:
+        logger.warning(f"获取音频时长失败: {e}")
+        return None
     
-    Args:
-        file_path: 要删除的文件路径
-    """
     try:
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-            logger.debug(f"已清理临时文件: {file_path}")
+        import librosa
+        duration = librosa.get_duration(path=file_path)
+        return duration
     except Exception as e:
-        logger.warning(f"清理临时文件失败: {file_path}, 错误: {e}")
+        logger.warning(f"获取音频时长失败: {e}")
+        return None
 
 
-def get_audio_duration(file_path: str) -> Optional[float]:
+def _read_wav_duration(file_path: str, file_size: int) -> Optional[float]:
     """
-    获取音频文件时长
+    只解析 RIFF/WAVE 头部计算 WAV 时长, 不解码音频
+    
+    逐个遍历 chunk 查找 fmt 和 data, 不假设头部固定为 44 字节 (可能存在 LIST 等额外 chunk)
     
     Args:
         file_path: 音频文件路径
+        file_size: 文件大小, 用于修正流式写入或被截断的 data 长度
         
     Returns:
-        音频时长(秒), 失败返回 None
+        音频时长(秒), 不是 WAV 文件或头部无法解析时返回 None
     """
-    try:
-        import librosa
-        duration = librosa.get_duration(path=file_path)
-        return duration
-    except Exception as e:
-        logger.warning(f"获取音频时长失败: {e}")
-        return None
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        
+        bytes_per_second = 0
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+            
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                audio_format, _, _, byte_rate, _ = struct.unpack("<HHIIH", fmt[:14])
+                # 只处理 PCM / IEEE float / WAVE_FORMAT_EXTENSIBLE, ADPCM 等压缩格式交给 librosa
+                if audio_format not in (1, 3, 0xFFFE):
+                    return None
+                bytes_per_second = byte_rate
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if not bytes_per_second:
+                    return None
+                # 流式写入的 WAV 可能将 data 长度写为 0 或 0xFFFFFFFF
+                remaining = file_size - f.tell()
+                data_size = remaining if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, remaining)
+                return max(data_size, 0) / bytes_per_second
+            else:
+                # chunk 按 2 字节对齐
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def get_audio_duration_from_array(audio: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> float:
+    """
+    根据已解码的音频数组计算时长, 无需再次读取文件
+    
+    Args:
+        audio: 单声道音频数组
+        sample_rate: 采样率
+        
+    Returns:
+        音频时长(秒)
+    """
+    return len(audio) / sample_rate
 
 
 def convert_audio_to_wav(input_path: str, output_path: Optional[str] = None) -> str:
     """
     将音频文件转换为 WAV 格式 (16kHz, 单声道)
     
-    Canary 模型要求输入为 16kHz 单声道音频
+    Canary 模型要求输入为 16kHz 单声道音频。
+    使用 decode_audio 在进程内解码, 不启动 FFmpeg 子进程, 直接写出 16 位 PCM
     
     Args:
         input_path: 输入音频文件路径
@@ -309,14 +515,11 @@ def convert_audio_to_wav(input_path: str, output_path: Optional[str] = None) ->
         转换后的 WAV 文件路径
     """
     try:
-        from pydub import AudioSegment
+        import soundfile as sf
         
-        # 加载音频
-        audio = AudioSegment.from_file(input_path)
-        
-        # 转换为单声道, 16kHz
-        audio = audio.set_channels(1)
-        audio = audio.set_frame_rate(16000)
+        # 解码为 16kHz 单声道
+        with open(input_path, "rb") as f:
+            audio = decode_audio(f, suffix=Path(input_path).suffix or ".wav")
         
         # 确定输出路径
         if not output_path:
@@ -324,8 +527,8 @@ def convert_audio_to_wav(input_path: str, output_path: Optional[str] = None) ->
             os.close(fd)
         
         # 导出为 WAV
-        audio.export(output_path, format="wav")
-        logger.debug(f"音频已转换为 WAV: {output_path}")
+        sf.write(output_path, audio, TARGET_SAMPLE_RATE, subtype="PCM_16", format="WAV")
+        logger.debug("音频已转换为 WAV: {}", output_path)
         
         return output_path
         
@@ -334,6 +537,77 @@ def convert_audio_to_wav(input_path: str, output_path: Optional[str] = None) ->
         raise
 
 
+def decode_audio(source: Union[bytes, BinaryIO], suffix: str = ".wav") -> np.ndarray:
+    """
+    在进程内将音频解码为 16kHz 单声道 float32 数组
+    
+    不写临时文件, 也不启动 FFmpeg 子进程:
+    - wav/flac/ogg/opus/mp3 使用 soundfile (libsndfile) 解码
+    - 其他格式 (m4a, webm 等) 或 libsndfile 解码失败时使用 PyAV (libav) 解码并重采样
+    
+    Args:
+        source: 音频字节内容, 或可 seek 的二进制文件对象 (如上传文件)
+        suffix: 文件后缀名, 用于选择解码器
+        
+    Returns:
+        16kHz 单声道 float32 音频数组
+    """
+    audio_file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    
+    if suffix.lower() in SOUNDFILE_FORMATS:
+        try:
+            audio_file.seek(0)
+            return _decode_with_soundfile(audio_file)
+        except Exception as e:
+            # 后缀与实际内容不符或 libsndfile 不支持的编码, 交给 PyAV 处理
+            logger.debug("soundfile 解码失败, 改用 PyAV: {}", e)
+    
+    audio_file.seek(0)
+    return _decode_with_av(audio_file)
+
+
+def _decode_with_soundfile(audio_file: BinaryIO) -> np.ndarray:
+    """使用 soundfile 解码, 必要时混音为单声道并重采样"""
+    import soundfile as sf
+    
+    audio, sample_rate = sf.read(audio_file, dtype="float32", always_2d=False)
+    
+    # 多声道混音为单声道
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    
+    if sample_rate != TARGET_SAMPLE_RATE:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=TARGET_SAMPLE_RATE)
+    
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _decode_with_av(audio_file: BinaryIO) -> np.ndarray:
+    """使用 PyAV 解码, 由 libav 重采样为 16kHz 单声道 float32"""
+    import av
+    
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=TARGET_SAMPLE_RATE)
+    chunks = []
+    
+    with av.open(audio_file) as container:
+        if not container.streams.audio:
+            raise ValueError("文件中未找到音频流")
+        
+        for frame in container.decode(container.streams.audio[0]):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        
+        # 刷新重采样器中的剩余数据
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
+    
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
 # 语言代码映射: OpenAI Whisper 语言代码 -> Canary 语言代码
 LANGUAGE_CODE_MAP = {
     # Canary 支持的 25 种欧洲语言
@@ -390,10 +664,13 @@ LANGUAGE_CODE_MAP = {
 }
 
 
+@lru_cache(maxsize=128)
 def normalize_language_code(language: Optional[str]) -> str:
     """
     标准化语言代码为 Canary 支持的格式
     
+    输入来自很小的语言集合, 结果使用 LRU 缓存 (未知语言的警告只记录一次)
+    
     Args:
         language: 输入的语言代码或语言名称
         